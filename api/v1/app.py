@@ -7,6 +7,7 @@ Main app module to start Flask for the API
 
 from flask import Flask, jsonify
 from flask_cors import CORS
+from api.v1.compression import compress
 from api.v1.views.index import app_views
 from models import storage
 
@@ -14,6 +15,7 @@ from models import storage
 app = Flask(__name__)
 app.url_map.strict_slashes = False
 app.register_blueprint(app_views)
+compress(app)
 
 CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 
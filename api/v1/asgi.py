@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+ASGI entry point of the API, e.g. `uvicorn api.v1.asgi:application`.
+
+The event loop of the ASGI server holds the connections, and only the
+handling of a request takes one of the HBNB_API_WORKERS threads (16 by
+default) running the Flask app, so idle keep-alive connections cost no
+thread. Response bodies, streamed ones included, are sent as the app
+produces them: the worker hands them to the event loop through a queue
+of HBNB_API_QUEUE chunks (64 by default), and is released once the app
+is done, so a slow client only holds it while that queue is full.
+"""
+
+from api.v1.app import app
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+from os import getenv
+import sys
+import threading
+
+workers = int(getenv('HBNB_API_WORKERS', 16))
+queue_size = int(getenv('HBNB_API_QUEUE', 64))
+executor = ThreadPoolExecutor(max_workers=workers,
+                              thread_name_prefix="api")
+
+
+def environ(scope, body):
+    """Returns the WSGI environ of the HTTP request of scope"""
+    server = scope.get("server") or ("localhost", 80)
+    env = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/" + scope.get("http_version", "1.1"),
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = "HTTP_" + name
+        value = value.decode("latin-1")
+        if name in env:
+            value = env[name] + "," + value
+        env[name] = value
+    env["CONTENT_LENGTH"] = str(len(body))
+    env.pop("HTTP_TRANSFER_ENCODING", None)
+    return env
+
+
+def respond(env, queue, loop, closed):
+    """Calls the Flask app on env in a worker and queues its response
+    messages for the event loop, then None, until closed is set"""
+    def emit(message):
+        asyncio.run_coroutine_threadsafe(queue.put(message), loop).result()
+
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [int(status.split(" ", 1)[0]),
+                      [(name.lower().encode("latin-1"),
+                        value.encode("latin-1")) for name, value in headers]]
+
+    def start():
+        if len(started) == 2:
+            emit({"type": "http.response.start", "status": started[0],
+                  "headers": started[1]})
+            started.append(True)
+
+    try:
+        result = app(env, start_response)
+        try:
+            for chunk in result:
+                if closed.is_set():
+                    return
+                start()
+                if chunk:
+                    emit({"type": "http.response.body", "body": chunk,
+                          "more_body": True})
+            start()
+            emit({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+    finally:
+        emit(None)
+
+
+async def application(scope, receive, send):
+    """Serves the API to an ASGI server"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    body = []
+    while True:
+        message = await receive()
+        body.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    closed = threading.Event()
+    done = loop.run_in_executor(executor, respond,
+                                environ(scope, b"".join(body)), queue, loop,
+                                closed)
+    message = True
+    try:
+        while message is not None:
+            message = await queue.get()
+            if message is not None:
+                await send(message)
+    finally:
+        closed.set()
+        while message is not None:
+            message = await queue.get()
+        await done
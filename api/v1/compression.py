@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Negotiated compression of the responses of the Flask apps.
+
+compress(app) makes app encode its text and JSON responses of at least
+HBNB_COMPRESS_MIN_SIZE bytes (500 by default) with the encoding the
+client prefers among gzip and, when their modules are installed, br
+(brotli) and zstd (zstandard), at HBNB_COMPRESS_LEVEL (6 by default).
+Streamed, already encoded and file responses are left alone. The ETag
+of an encoded response is made weak, as its bytes differ from those of
+the identity representation; a 304 has no body to decide on, so its
+ETag is only made weak when the client validated with the weak tag of
+an encoded response.
+"""
+
+from flask import request
+import gzip
+from os import getenv
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+min_size = int(getenv('HBNB_COMPRESS_MIN_SIZE', 500))
+level = int(getenv('HBNB_COMPRESS_LEVEL', 6))
+mimetypes = ("application/json", "application/x-ndjson",
+             "application/javascript", "image/svg+xml")
+
+encoders = {"gzip": lambda data: gzip.compress(data, level, mtime=0)}
+if brotli is not None:
+    encoders["br"] = lambda data: brotli.compress(data, quality=level)
+if zstandard is not None:
+    encoders["zstd"] = lambda data: zstandard.ZstdCompressor(
+        level=level).compress(data)
+
+
+def negotiate():
+    """Returns the encoding of encoders the request prefers, or None"""
+    best, quality = None, 0
+    for encoding in ("br", "zstd", "gzip"):
+        if encoding in encoders:
+            q = request.accept_encodings[encoding]
+            if q > quality:
+                best, quality = encoding, q
+    return best
+
+
+def compressible(response):
+    """Returns True if the type of the response is worth compressing"""
+    mimetype = response.mimetype or ""
+    return (not response.is_streamed and not response.direct_passthrough and
+            (mimetype.startswith("text/") or mimetype in mimetypes))
+
+
+def encode(encoding, data):
+    """Returns data encoded with encoding, or None if it is too small to
+    be worth it"""
+    if len(data) < min_size:
+        return None
+    return encoders[encoding](data)
+
+
+def weaken_etag(response):
+    """Makes the ETag of the response weak"""
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        response.set_etag(tag, weak=True)
+
+
+def compress(app):
+    """Registers on app the after request hook compressing responses"""
+    @app.after_request
+    def compress_response(response):
+        """Encodes the response with the encoding the client prefers"""
+        if response.status_code == 304:
+            tag, weak = response.get_etag()
+            if tag and request.if_none_match.is_weak(tag):
+                weaken_etag(response)
+            return response
+        if not compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        if 'Content-Encoding' not in response.headers:
+            encoding = negotiate()
+            if encoding is None:
+                return response
+            data = encode(encoding, response.get_data())
+            if data is None:
+                return response
+            response.set_data(data)
+            response.headers['Content-Encoding'] = encoding
+        weaken_etag(response)
+        return response
+    return app
@@ -6,62 +6,109 @@ It includes routes to retrieve, create, delete, and update amenities.
 
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 from models import storage
 from models.amenity import Amenity
 
 
 @app_views.route('/amenities', methods=['GET'])
+@conditional(Amenity)
+@cached(Amenity)
 def get_amenities():
     """Retrieves the list of all Amenity objects."""
-    amenities = storage.all(Amenity).values()
-    return jsonify([amenity.to_dict() for amenity in amenities])
+    response = paginate(Amenity) or stream(Amenity)
+    if response is not None:
+        return response
+    fields = requested_fields(Amenity)
+    amenities = storage.all(Amenity, fields).values()
+    return jsonify([amenity.to_dict(fields) for amenity in amenities])
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'])
+@conditional(Amenity, id_arg='amenity_id')
 def get_amenity(amenity_id):
     """Retrieves a specific Amenity by ID."""
     amenity = storage.get(Amenity, amenity_id)
     if amenity is None:
         abort(404)
-    return jsonify(amenity.to_dict())
+    return jsonify(amenity.to_dict(requested_fields(Amenity)))
 
 
-@app_views.route('/amenities/<amenity_id>', methods=['DELETE'])
-def delete_amenity(amenity_id):
-    """Deletes an Amenity by ID."""
+def remove_amenity(amenity_id):
+    """Deletes an Amenity by ID, without saving."""
     amenity = storage.get(Amenity, amenity_id)
     if amenity is None:
         abort(404)
     storage.delete(amenity)
+
+
+@app_views.route('/amenities/<amenity_id>', methods=['DELETE'])
+def delete_amenity(amenity_id):
+    """Deletes an Amenity by ID."""
+    remove_amenity(amenity_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/amenities', methods=['POST'])
-def create_amenity():
-    """Creates a new Amenity."""
-    data = request.get_json(silent=True)
+def add_amenity(data):
+    """Creates a new Amenity from data, without saving."""
     if not data:
         abort(400, description="Not a JSON")
     if 'name' not in data:
         abort(400, description="Missing name")
     new_amenity = Amenity(**data)
     storage.new(new_amenity)
+    return new_amenity
+
+
+@app_views.route('/amenities', methods=['POST'])
+def create_amenity():
+    """Creates a new Amenity."""
+    new_amenity = add_amenity(request.get_json(silent=True))
     storage.save()
     return jsonify(new_amenity.to_dict()), 201
 
 
-@app_views.route('/amenities/<amenity_id>', methods=['PUT'])
-def update_amenity(amenity_id):
-    """Updates an Amenity by ID."""
+def edit_amenity(amenity_id, data):
+    """Updates an Amenity by ID with data, without saving."""
     amenity = storage.get(Amenity, amenity_id)
     if amenity is None:
         abort(404)
-    data = request.get_json(silent=True)
     if not data:
         abort(400, description="Not a JSON")
     for key, value in data.items():
         if key not in ['id', 'created_at', 'updated_at']:
             setattr(amenity, key, value)
+    amenity.touch()
+    return amenity
+
+
+@app_views.route('/amenities/<amenity_id>', methods=['PUT'])
+def update_amenity(amenity_id):
+    """Updates an Amenity by ID."""
+    amenity = edit_amenity(amenity_id, request.get_json(silent=True))
     storage.save()
     return jsonify(amenity.to_dict()), 200
+
+
+@app_views.route('/amenities/batch', methods=['POST'])
+def create_amenities():
+    """Creates an Amenity for each object of the JSON array."""
+    return batch(add_amenity, 201)
+
+
+@app_views.route('/amenities/batch', methods=['PUT'])
+def update_amenities():
+    """Updates an Amenity for each object of the JSON array, by id."""
+    return batch(lambda data: edit_amenity(data.get('id'), data))
+
+
+@app_views.route('/amenities/batch', methods=['DELETE'])
+def delete_amenities():
+    """Deletes an Amenity for each object of the JSON array, by id."""
+    return batch(lambda data: remove_amenity(data.get('id')))
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+Batch requests for the write routes of the API.
+
+A batch route takes a JSON array and applies to each of its objects the
+handler, and so the validation, of the matching single object route.
+All the changes are persisted with a single save. The response lists
+the result of each object in order, either
+{"status": <code>, "object": {...}} or {"status": <code>, "error": "..."}.
+Arrays are limited to HBNB_API_BATCH_MAX objects (10000 by default).
+"""
+
+from flask import abort, jsonify, request
+from models import storage
+from os import getenv
+from werkzeug.exceptions import HTTPException
+
+max_items = int(getenv('HBNB_API_BATCH_MAX', 10000))
+
+
+def batch(handle, status=200):
+    """Returns the response listing the results of calling handle on each
+    object of the JSON array of the request, which answers with status
+    and the object it changed (or None), or aborts"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        abort(400, description="Not a JSON array")
+    if len(items) > max_items:
+        abort(413, description="Too many objects")
+    results = []
+    for item in items:
+        try:
+            if not isinstance(item, dict):
+                abort(400, description="Not a JSON")
+            obj = handle(item)
+        except HTTPException as e:
+            results.append({"status": e.code, "error": e.description})
+            continue
+        result = {"status": status}
+        if obj is not None:
+            result["object"] = obj.to_dict()
+        results.append(result)
+    if any(result["status"] == status for result in results):
+        storage.save()
+    return jsonify(results), 200
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""
+In-process response cache for the read routes of the API.
+
+The decorated views keep their 200 responses in an LRU cache keyed by
+path, query arguments and preferred type, bounded by the total size of
+the bodies (HBNB_API_CACHE_BYTES, 16 MiB by default, 0 to disable).
+Each entry records the storage versions of the classes it depends on
+and is served only while those are unchanged, so any new, delete or
+update of those classes invalidates it. The entries also keep the
+bodies encoded for the clients accepting compression, so a hit does not
+compress again. Streamed responses are not cached.
+"""
+
+from api.v1.compression import compressible, encode, negotiate
+from api.v1.views.conditional import versions
+from collections import OrderedDict
+from flask import Response, make_response, request
+from functools import wraps
+from os import getenv
+import threading
+
+
+class ResponseCache:
+    """LRU cache of responses, bounded by the total size of the bodies"""
+
+    def __init__(self, max_bytes):
+        """Initializes an empty cache holding at most max_bytes"""
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, versions, encoding=None):
+        """Returns the response cached for key with versions, encoded with
+        encoding when worth it, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] != versions:
+                self.__remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        response = Response(entry[3], status=entry[1], headers=entry[2])
+        return self.__encode(key, entry, response, encoding)
+
+    def put(self, key, versions, response, encoding=None):
+        """Caches the response for key, valid while versions hold, and
+        returns it encoded with encoding when worth it"""
+        if (response.status_code != 200 or response.is_streamed or
+                response.direct_passthrough):
+            return response
+        body = response.get_data()
+        if len(body) > self.max_bytes:
+            return response
+        headers = [(name, value) for name, value in response.headers
+                   if name not in ('ETag', 'Last-Modified', 'Vary')]
+        entry = (versions, response.status_code, headers, body, {})
+        with self.lock:
+            if key in self.entries:
+                self.__remove(key)
+            self.entries[key] = entry
+            self.size += len(body)
+            self.__shrink()
+        return self.__encode(key, entry, response, encoding)
+
+    def clear(self):
+        """Removes every entry"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Returns the counters of the cache"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self.entries), "bytes": self.size,
+                    "max_bytes": self.max_bytes}
+
+    def __encode(self, key, entry, response, encoding):
+        """Returns the response of entry encoded with encoding, keeping the
+        encoded body in entry"""
+        if encoding is None or not compressible(response):
+            return response
+        data = entry[4].get(encoding)
+        if data is None:
+            data = encode(encoding, entry[3])
+            if data is None:
+                return response
+            with self.lock:
+                if (self.entries.get(key) is entry and
+                        encoding not in entry[4]):
+                    entry[4][encoding] = data
+                    self.size += len(data)
+                    self.__shrink()
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def __shrink(self):
+        """Removes the least recently used entries until the cache fits,
+        the lock being held"""
+        while self.size > self.max_bytes:
+            self.__remove(next(iter(self.entries)))
+
+    def __remove(self, key):
+        """Removes the entry key, the lock being held"""
+        entry = self.entries.pop(key)
+        self.size -= len(entry[3]) + sum(map(len, entry[4].values()))
+
+
+cache = ResponseCache(int(getenv('HBNB_API_CACHE_BYTES', 16777216)))
+
+
+def cached(*clss):
+    """Decorates a GET view whose response depends only on its arguments
+    and on the objects of the classes clss, to serve it from cache"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if cache.max_bytes <= 0:
+                return view(*args, **kwargs)
+            key = (request.path,
+                   tuple(sorted(request.args.items(multi=True))),
+                   request.accept_mimetypes.best)
+            found = tuple(version for version, modified in versions(clss))
+            encoding = negotiate()
+            response = cache.get(key, found, encoding)
+            if response is not None:
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            response = cache.put(key, found,
+                                 make_response(view(*args, **kwargs)),
+                                 encoding)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -18,6 +18,12 @@ the `storage` object to fetch, create, or modify city data.
 
 
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 from flask import jsonify, request, abort
 from models import storage
 from models.city import City
@@ -25,66 +31,110 @@ from models.state import State
 
 
 @app_views.route('/states/<state_id>/cities', methods=['GET'])
+@conditional(City, State)
+@cached(City, State)
 def get_cities_by_state(state_id):
     """Retrieves the list of all City objects of a State."""
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    cities = [city.to_dict() for city in state.cities]
+    response = (paginate(City, "state_id", state.id) or
+                stream(City, "state_id", state.id))
+    if response is not None:
+        return response
+    fields = requested_fields(City)
+    cities = [city.to_dict(fields) for city in
+              storage.iterate(City, "state_id", state.id, fields=fields)]
     return jsonify(cities)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'])
+@conditional(City, id_arg='city_id')
 def get_city(city_id):
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    return jsonify(city.to_dict())
+    return jsonify(city.to_dict(requested_fields(City)))
 
 
-@app_views.route('/cities/<city_id>', methods=['DELETE'])
-def delete_city(city_id):
+def remove_city(city_id):
+    """Deletes a City by ID, without saving."""
     city = storage.get(City, city_id)
     if not city:
         abort(404)
     storage.delete(city)
+
+
+@app_views.route('/cities/<city_id>', methods=['DELETE'])
+def delete_city(city_id):
+    remove_city(city_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/states/<state_id>/cities', methods=['POST'])
-def create_city(state_id):
+def add_city(state_id, data):
+    """Creates a new City of a State from data, without saving."""
     state = storage.get(State, state_id)
     if not state:
         abort(404)
 
-    if not request.is_json:
+    if data is None:
         abort(400, description="Not a JSON")
 
-    data = request.get_json()
     if 'name' not in data:
         abort(400, description="Missing name")
 
     city = City(name=data['name'], state_id=state_id)
     storage.new(city)
+    return city
+
+
+@app_views.route('/states/<state_id>/cities', methods=['POST'])
+def create_city(state_id):
+    data = request.get_json(silent=True) if request.is_json else None
+    city = add_city(state_id, data)
     storage.save()
     return jsonify(city.to_dict()), 201
 
 
-@app_views.route('/cities/<city_id>', methods=['PUT'])
-def update_city(city_id):
+def edit_city(city_id, data):
+    """Updates a City by ID with data, without saving."""
     city = storage.get(City, city_id)
     if not city:
         abort(404)
 
-    if not request.is_json:
+    if data is None:
         abort(400, description="Not a JSON")
 
-    data = request.get_json()
-
     for key, value in data.items():
         if key not in ['id', 'state_id', 'created_at', 'updated_at']:
             setattr(city, key, value)
 
+    city.touch()
+    return city
+
+
+@app_views.route('/cities/<city_id>', methods=['PUT'])
+def update_city(city_id):
+    data = request.get_json(silent=True) if request.is_json else None
+    city = edit_city(city_id, data)
     storage.save()
     return jsonify(city.to_dict()), 200
+
+
+@app_views.route('/states/<state_id>/cities/batch', methods=['POST'])
+def create_cities(state_id):
+    """Creates a City of a State for each object of the JSON array."""
+    return batch(lambda data: add_city(state_id, data), 201)
+
+
+@app_views.route('/cities/batch', methods=['PUT'])
+def update_cities():
+    """Updates a City for each object of the JSON array, by id."""
+    return batch(lambda data: edit_city(data.get('id'), data))
+
+
+@app_views.route('/cities/batch', methods=['DELETE'])
+def delete_cities():
+    """Deletes a City for each object of the JSON array, by id."""
+    return batch(lambda data: remove_city(data.get('id')))
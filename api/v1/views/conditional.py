@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Conditional GET support for the API.
+
+The decorated views answer with an ETag and a Last-Modified header, and
+with an empty 304 response when the request already holds the current
+representation (If-None-Match, or If-Modified-Since without it). Both
+are computed from storage before the view runs, so a 304 costs no
+serialization. Objects are validated by their updated_at, stored to
+the microsecond; collections by the versions storage keeps for each
+class they list, which change with every write.
+"""
+
+from api.v1.views.streaming import ndjson
+from flask import g, make_response, request
+from functools import wraps
+from models import storage
+
+
+def versions(clss):
+    """Returns the (version, last modification) pairs of the classes
+    clss, read from storage once per request"""
+    known = g.setdefault('versions', {})
+    missing = [cls for cls in clss if cls.__name__ not in known]
+    if missing:
+        known.update(storage.versions(missing))
+    return [known[cls.__name__] for cls in clss]
+
+
+def validators(clss, id_arg, kwargs):
+    """Returns the ETag and the last modification datetime of the object
+    of clss[0] whose id is kwargs[id_arg], or of the objects of clss if
+    id_arg is None; None if there is no such object"""
+    if id_arg is not None:
+        obj = storage.get(clss[0], kwargs[id_arg])
+        if obj is None:
+            return None
+        return obj.updated_at.isoformat(), obj.updated_at
+    found = versions(clss)
+    etag = "-".join(version for version, modified in found)
+    if request.accept_mimetypes.best == ndjson:
+        etag += "-ndjson"
+    dates = [modified for version, modified in found if modified]
+    return etag, max(dates) if dates else None
+
+
+def not_modified(etag, modified):
+    """Returns True if the client holds the representation tagged etag
+    or last modified at modified"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return (since is not None and modified is not None and
+            modified.replace(microsecond=0) <= since.replace(tzinfo=None))
+
+
+def conditional(*clss, id_arg=None):
+    """Decorates a GET view listing the objects of the classes clss (or
+    returning the object of clss[0] whose id is its argument id_arg) to
+    answer conditional requests"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            found = validators(clss, id_arg, kwargs)
+            if found is None:
+                return view(*args, **kwargs)
+            etag, modified = found
+            if not_modified(etag, modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = modified
+            if id_arg is None:
+                response.vary.add("Accept")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""
+Sparse fieldsets for the responses of the API.
+
+A `fields` query parameter, a comma separated list of keys, limits the
+objects of a response to those keys. `@<name>` stands for the keys of
+a named projection, e.g. `fields=@card` for the Places as rendered by
+the 4-hbnb page.
+"""
+
+from flask import abort, request
+
+projections = {
+    "summary": {
+        "Amenity": ("id", "name"),
+        "City": ("id", "name", "state_id"),
+        "Place": ("id", "name", "city_id", "price_by_night"),
+        "Review": ("id", "place_id", "user_id"),
+        "State": ("id", "name"),
+        "User": ("id", "email", "first_name", "last_name"),
+    },
+    "card": {
+        "Place": ("id", "name", "price_by_night", "max_guest",
+                  "number_rooms", "number_bathrooms", "description"),
+    },
+}
+
+
+def requested_fields(cls):
+    """Returns the list of the keys the request asks for the objects of
+    cls, or None for all of them"""
+    value = request.args.get('fields')
+    if not value:
+        return None
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if name.startswith('@'):
+            projection = projections.get(name[1:], {}).get(cls.__name__)
+            if projection is None:
+                abort(400, description="Unknown projection")
+            fields.extend(projection)
+        elif name:
+            fields.append(name)
+    return list(dict.fromkeys(fields))
@@ -7,6 +7,8 @@ Defines routes for index
 
 from flask import jsonify
 from api.v1.views import app_views
+from api.v1.views.cache import cache, cached
+from api.v1.views.conditional import conditional
 from models import storage
 from models.amenity import Amenity
 from models.city import City
@@ -23,14 +25,23 @@ def status():
 
 
 @app_views.route('/stats', methods=['GET'])
+@conditional(Amenity, City, Place, Review, State, User)
+@cached(Amenity, City, Place, Review, State, User)
 def stats():
     """Returns the counts of each object by type."""
+    counts = storage.counts([Amenity, City, Place, Review, State, User])
     stats_data = {
-        "amenities": storage.count(Amenity),
-        "cities": storage.count(City),
-        "places": storage.count(Place),
-        "reviews": storage.count(Review),
-        "states": storage.count(State),
-        "users": storage.count(User)
+        "amenities": counts["Amenity"],
+        "cities": counts["City"],
+        "places": counts["Place"],
+        "reviews": counts["Review"],
+        "states": counts["State"],
+        "users": counts["User"]
     }
     return jsonify(stats_data)
+
+
+@app_views.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    """Returns the hit and miss counters of the response cache."""
+    return jsonify(cache.stats())
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Keyset pagination for the collection routes of the API.
+
+A request with a `limit` or a `cursor` query parameter gets one page of
+the collection, ordered by creation date then id. When more objects
+follow, the response has a `Link: <url>; rel="next"` header whose url
+carries the opaque cursor of the next page.
+"""
+
+import base64
+import json
+from api.v1.views.fields import requested_fields
+from flask import abort, jsonify, request
+from models import storage
+from models.base_model import format_time, parse_time
+from urllib.parse import urlencode
+
+default_limit = 100
+max_limit = 1000
+
+
+def encode_cursor(obj):
+    """Returns the cursor of the page starting after obj"""
+    key = json.dumps([format_time(obj.created_at), obj.id])
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Returns the (created_at, id) pair encoded in cursor"""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor))
+        return parse_time(created_at), str(id)
+    except (ValueError, TypeError):
+        abort(400, description="Invalid cursor")
+
+
+def paginate(cls, attr=None, value=None):
+    """Returns the response listing a page of the objects of cls (only
+    those whose attr equals value, if given), or None when the request
+    asks for no page"""
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        abort(400, description="Invalid limit")
+    if limit < 1:
+        abort(400, description="Invalid limit")
+    limit = min(limit, max_limit)
+    after = None
+    if request.args.get('cursor'):
+        after = decode_cursor(request.args['cursor'])
+    fields = requested_fields(cls)
+    objs = storage.page(cls, limit + 1, after, attr, value,
+                        fields and fields + ['created_at', 'id'])
+    response = jsonify([obj.to_dict(fields) for obj in objs[:limit]])
+    if len(objs) > limit:
+        args = request.args.to_dict()
+        args.update(limit=limit, cursor=encode_cursor(objs[limit - 1]))
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
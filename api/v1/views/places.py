@@ -6,6 +6,12 @@ It includes routes to retrieve, create, delete, and update places.
 
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 from models import storage
 from models.city import City
 from models.place import Place
@@ -13,45 +19,56 @@ from models.user import User
 
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'])
+@conditional(Place, City)
+@cached(Place, City)
 def get_places_by_city(city_id):
     """Retrieves the list of all Place objects of a City."""
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    places = [place.to_dict() for place in city.places]
+    response = (paginate(Place, "city_id", city.id) or
+                stream(Place, "city_id", city.id))
+    if response is not None:
+        return response
+    fields = requested_fields(Place)
+    places = [place.to_dict(fields) for place in
+              storage.iterate(Place, "city_id", city.id, fields=fields)]
     return jsonify(places)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'])
+@conditional(Place, id_arg='place_id')
 def get_place(place_id):
     """Retrieves a specific Place by ID."""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
-    return jsonify(place.to_dict())
+    return jsonify(place.to_dict(requested_fields(Place)))
 
 
-@app_views.route('/places/<place_id>', methods=['DELETE'])
-def delete_place(place_id):
-    """Deletes a Place by ID."""
+def remove_place(place_id):
+    """Deletes a Place by ID, without saving."""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
     storage.delete(place)
+
+
+@app_views.route('/places/<place_id>', methods=['DELETE'])
+def delete_place(place_id):
+    """Deletes a Place by ID."""
+    remove_place(place_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/cities/<city_id>/places', methods=['POST'])
-def create_place(city_id):
-    """Creates a new Place under a specific City."""
+def add_place(city_id, data):
+    """Creates a new Place under a specific City from data, without
+    saving."""
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    if not request.is_json:
-        abort(400, description="Not a JSON")
 
-    data = request.get_json(silent=True)
     if data is None:
         abort(400, description="Not a JSON")
     if 'user_id' not in data:
@@ -71,18 +88,24 @@ def create_place(city_id):
             setattr(new_place, key, value)
 
     storage.new(new_place)
+    return new_place
+
+
+@app_views.route('/cities/<city_id>/places', methods=['POST'])
+def create_place(city_id):
+    """Creates a new Place under a specific City."""
+    data = request.get_json(silent=True) if request.is_json else None
+    new_place = add_place(city_id, data)
     storage.save()
     return jsonify(new_place.to_dict()), 201
 
 
-@app_views.route('/places/<place_id>', methods=['PUT'])
-def update_place(place_id):
-    """Updates a Place by ID."""
+def edit_place(place_id, data):
+    """Updates a Place by ID with data, without saving."""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
 
-    data = request.get_json(silent=True)
     if not data:
         abort(400, description="Not a JSON")
 
@@ -90,5 +113,51 @@ def update_place(place_id):
         if key not in ['id', 'user_id', 'city_id', 'created_at', 'updated_at']:
             setattr(place, key, value)
 
+    place.touch()
+    return place
+
+
+@app_views.route('/places/<place_id>', methods=['PUT'])
+def update_place(place_id):
+    """Updates a Place by ID."""
+    place = edit_place(place_id, request.get_json(silent=True))
     storage.save()
     return jsonify(place.to_dict()), 200
+
+
+@app_views.route('/cities/<city_id>/places/batch', methods=['POST'])
+def create_places(city_id):
+    """Creates a Place under a specific City for each object of the JSON
+    array."""
+    return batch(lambda data: add_place(city_id, data), 201)
+
+
+@app_views.route('/places/batch', methods=['PUT'])
+def update_places():
+    """Updates a Place for each object of the JSON array, by id."""
+    return batch(lambda data: edit_place(data.get('id'), data))
+
+
+@app_views.route('/places/batch', methods=['DELETE'])
+def delete_places():
+    """Deletes a Place for each object of the JSON array, by id."""
+    return batch(lambda data: remove_place(data.get('id')))
+
+
+@app_views.route('/places_search', methods=['POST'])
+def search_places():
+    """Retrieves the Places in the states or cities of the JSON body
+    that have all of its amenities (all Places if the lists are empty)."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, description="Not a JSON")
+    ids = {}
+    for key in ('states', 'cities', 'amenities'):
+        ids[key] = data.get(key) or []
+        if (not isinstance(ids[key], list) or
+                not all(isinstance(id, str) for id in ids[key])):
+            abort(400, description="{} must be a list of ids".format(key))
+    fields = requested_fields(Place)
+    places = storage.search_places(ids['states'], ids['cities'],
+                                   ids['amenities'], fields=fields)
+    return jsonify([place.to_dict(fields) for place in places])
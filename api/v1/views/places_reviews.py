@@ -7,6 +7,12 @@ It includes routes to retrieve, create, delete, and update reviews for places.
 
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 from models import storage
 from models.place import Place
 from models.review import Review
@@ -14,46 +20,59 @@ from models.user import User
 
 
 @app_views.route('/places/<place_id>/reviews', methods=['GET'])
+@conditional(Review, Place)
+@cached(Review, Place)
 def get_reviews_by_place(place_id):
     """Retrieves the list of all Review objects of a Place."""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
-    reviews = [review.to_dict() for review in place.reviews]
+    response = (paginate(Review, "place_id", place.id) or
+                stream(Review, "place_id", place.id))
+    if response is not None:
+        return response
+    fields = requested_fields(Review)
+    reviews = [review.to_dict(fields) for review in
+               storage.iterate(Review, "place_id", place.id, fields=fields)]
     return jsonify(reviews)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'])
+@conditional(Review, id_arg='review_id')
 def get_review(review_id):
     """Retrieves a specific Review by ID."""
     review = storage.get(Review, review_id)
     if not review:
         abort(404)
-    return jsonify(review.to_dict())
+    return jsonify(review.to_dict(requested_fields(Review)))
 
 
-@app_views.route('/reviews/<review_id>', methods=['DELETE'])
-def delete_review(review_id):
-    """Deletes a Review by ID."""
+def remove_review(review_id):
+    """Deletes a Review by ID, without saving."""
     review = storage.get(Review, review_id)
     if not review:
         abort(404)
     storage.delete(review)
+
+
+@app_views.route('/reviews/<review_id>', methods=['DELETE'])
+def delete_review(review_id):
+    """Deletes a Review by ID."""
+    remove_review(review_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/places/<place_id>/reviews', methods=['POST'])
-def create_review(place_id):
-    """Creates a new Review under a specific Place."""
+def add_review(place_id, data):
+    """Creates a new Review under a specific Place from data, without
+    saving."""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
 
-    if not request.is_json:
+    if data is None:
         abort(400, description="Not a JSON")
 
-    data = request.get_json(silent=True)
     if 'user_id' not in data:
         abort(400, description="Missing user_id")
     if 'text' not in data:
@@ -73,26 +92,60 @@ def create_review(place_id):
             setattr(new_review, key, value)
 
     storage.new(new_review)
+    return new_review
+
+
+@app_views.route('/places/<place_id>/reviews', methods=['POST'])
+def create_review(place_id):
+    """Creates a new Review under a specific Place."""
+    data = request.get_json(silent=True) if request.is_json else None
+    new_review = add_review(place_id, data)
     storage.save()
     return jsonify(new_review.to_dict()), 201
 
 
-@app_views.route('/reviews/<review_id>', methods=['PUT'])
-def update_review(review_id):
-    """Updates a Review by ID."""
+def edit_review(review_id, data):
+    """Updates a Review by ID with data, without saving."""
     review = storage.get(Review, review_id)
     if not review:
         abort(404)
 
-    if not request.is_json:
+    if data is None:
         abort(400, description="Not a JSON")
 
-    data = request.get_json(silent=True)
     for key, value in data.items():
         if key not in [
             'id', 'user_id', 'place_id', 'created_at', 'updated_at'
         ]:
             setattr(review, key, value)
 
+    review.touch()
+    return review
+
+
+@app_views.route('/reviews/<review_id>', methods=['PUT'])
+def update_review(review_id):
+    """Updates a Review by ID."""
+    data = request.get_json(silent=True) if request.is_json else None
+    review = edit_review(review_id, data)
     storage.save()
     return jsonify(review.to_dict()), 200
+
+
+@app_views.route('/places/<place_id>/reviews/batch', methods=['POST'])
+def create_reviews(place_id):
+    """Creates a Review under a specific Place for each object of the
+    JSON array."""
+    return batch(lambda data: add_review(place_id, data), 201)
+
+
+@app_views.route('/reviews/batch', methods=['PUT'])
+def update_reviews():
+    """Updates a Review for each object of the JSON array, by id."""
+    return batch(lambda data: edit_review(data.get('id'), data))
+
+
+@app_views.route('/reviews/batch', methods=['DELETE'])
+def delete_reviews():
+    """Deletes a Review for each object of the JSON array, by id."""
+    return batch(lambda data: remove_review(data.get('id')))
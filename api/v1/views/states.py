@@ -9,58 +9,80 @@ from flask import jsonify, request, abort
 from models import storage
 from models.state import State
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 
 
 @app_views.route('/states', methods=['GET'])
+@conditional(State)
+@cached(State)
 def get_states():
     """Retrieves the list of all State objects"""
-    states = [state.to_dict() for state in storage.all(State).values()]
+    response = paginate(State) or stream(State)
+    if response is not None:
+        return response
+    fields = requested_fields(State)
+    states = [state.to_dict(fields)
+              for state in storage.all(State, fields).values()]
     return jsonify(states)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'])
+@conditional(State, id_arg='state_id')
 def get_state(state_id):
     """Retrieves a specific State object by ID"""
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    return jsonify(state.to_dict())
+    return jsonify(state.to_dict(requested_fields(State)))
 
 
-@app_views.route(
-    '/states/<state_id>', methods=['DELETE'])
-def delete_state(state_id):
-    """Deletes a State object by ID"""
+def remove_state(state_id):
+    """Deletes a State object by ID, without saving"""
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
     storage.delete(state)
+
+
+@app_views.route(
+    '/states/<state_id>', methods=['DELETE'])
+def delete_state(state_id):
+    """Deletes a State object by ID"""
+    remove_state(state_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/states', methods=['POST'])
-def create_state():
-    """Creates a new State object"""
-    data = request.get_json(silent=True)
+def add_state(data):
+    """Creates a new State object from data, without saving"""
     if data is None:
         abort(400, description="Not a JSON")
     if 'name' not in data:
         abort(400, description="Missing name")
     new_state = State(**data)
     storage.new(new_state)
+    return new_state
+
+
+@app_views.route('/states', methods=['POST'])
+def create_state():
+    """Creates a new State object"""
+    new_state = add_state(request.get_json(silent=True))
     storage.save()
     return jsonify(new_state.to_dict()), 201
 
 
-@app_views.route('/states/<state_id>', methods=['PUT'])
-def update_state(state_id):
-    """Updates an existing State object by ID"""
+def edit_state(state_id, data):
+    """Updates an existing State object by ID with data, without saving"""
     state = storage.get(State, state_id)
     if state is None:
         abort(404)
 
-    data = request.get_json(silent=True)
     if not data:
         abort(400, description="Not a JSON")
 
@@ -70,5 +92,31 @@ def update_state(state_id):
         if key not in ignore_keys:
             setattr(state, key, value)
 
+    state.touch()
+    return state
+
+
+@app_views.route('/states/<state_id>', methods=['PUT'])
+def update_state(state_id):
+    """Updates an existing State object by ID"""
+    state = edit_state(state_id, request.get_json(silent=True))
     storage.save()
     return jsonify(state.to_dict()), 200
+
+
+@app_views.route('/states/batch', methods=['POST'])
+def create_states():
+    """Creates a State object for each object of the JSON array"""
+    return batch(add_state, 201)
+
+
+@app_views.route('/states/batch', methods=['PUT'])
+def update_states():
+    """Updates the State object of each object of the JSON array by id"""
+    return batch(lambda data: edit_state(data.get('id'), data))
+
+
+@app_views.route('/states/batch', methods=['DELETE'])
+def delete_states():
+    """Deletes the State object of each object of the JSON array by id"""
+    return batch(lambda data: remove_state(data.get('id')))
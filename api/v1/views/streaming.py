@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+Streamed responses for the collection routes of the API.
+
+A request with `stream=json` gets the usual JSON array, written while
+the objects are read from storage instead of after all of them were
+serialized. A request with `stream=ndjson`, or whose preferred type is
+application/x-ndjson, gets one JSON object per line instead.
+"""
+
+import json
+from api.v1.views.fields import requested_fields
+from flask import Response, abort, request, stream_with_context
+from models import storage
+
+chunk_size = 65536
+ndjson = "application/x-ndjson"
+
+
+def chunks(objs, fields, start, sep, end, suffix=""):
+    """Yields the JSON of the keys fields (default: all) of the objects
+    objs framed by start, sep, suffix and end, in chunks of about
+    chunk_size characters"""
+    parts, size = [start], len(start)
+    for i, obj in enumerate(objs):
+        part = (sep if i else "") + json.dumps(obj.to_dict(fields)) + suffix
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(parts)
+            parts, size = [], 0
+    parts.append(end)
+    yield "".join(parts)
+
+
+def stream(cls, attr=None, value=None):
+    """Returns the response streaming the objects of cls (only those
+    whose attr equals value, if given), or None when the request asks
+    for no stream"""
+    fmt = request.args.get('stream')
+    if fmt is None and request.accept_mimetypes.best == ndjson:
+        fmt = 'ndjson'
+    if fmt is None:
+        return None
+    fields = requested_fields(cls)
+    objs = storage.iterate(cls, attr, value, fields=fields)
+    if fmt == 'ndjson':
+        body = chunks(objs, fields, "", "", "", "\n")
+        mimetype = ndjson
+    elif fmt == 'json':
+        body = chunks(objs, fields, "[", ",", "]\n")
+        mimetype = "application/json"
+    else:
+        abort(400, description="Invalid stream")
+    return Response(stream_with_context(body), mimetype=mimetype)
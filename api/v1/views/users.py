@@ -6,41 +6,57 @@ It includes routes to retrieve, create, delete, and update users.
 
 from flask import jsonify, abort, request
 from api.v1.views import app_views
+from api.v1.views.batch import batch
+from api.v1.views.cache import cached
+from api.v1.views.conditional import conditional
+from api.v1.views.fields import requested_fields
+from api.v1.views.pagination import paginate
+from api.v1.views.streaming import stream
 from models import storage
 from models.user import User
 
 
 @app_views.route('/users', methods=['GET'])
+@conditional(User)
+@cached(User)
 def get_users():
     """Retrieves the list of all User objects."""
-    users = storage.all(User).values()
-    return jsonify([user.to_dict() for user in users])
+    response = paginate(User) or stream(User)
+    if response is not None:
+        return response
+    fields = requested_fields(User)
+    users = storage.all(User, fields).values()
+    return jsonify([user.to_dict(fields) for user in users])
 
 
 @app_views.route('/users/<user_id>', methods=['GET'])
+@conditional(User, id_arg='user_id')
 def get_user(user_id):
     """Retrieves a specific User by ID."""
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
-    return jsonify(user.to_dict())
+    return jsonify(user.to_dict(requested_fields(User)))
 
 
-@app_views.route('/users/<user_id>', methods=['DELETE'])
-def delete_user(user_id):
-    """Deletes a User by ID."""
+def remove_user(user_id):
+    """Deletes a User by ID, without saving."""
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
     storage.delete(user)
+
+
+@app_views.route('/users/<user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    """Deletes a User by ID."""
+    remove_user(user_id)
     storage.save()
     return jsonify({}), 200
 
 
-@app_views.route('/users', methods=['POST'])
-def create_user():
-    """Creates a new User."""
-    data = request.get_json(silent=True)
+def add_user(data):
+    """Creates a new User from data, without saving."""
     if not data:
         abort(400, description="Not a JSON")
     if 'email' not in data:
@@ -49,21 +65,52 @@ def create_user():
         abort(400, description="Missing password")
     new_user = User(**data)
     storage.new(new_user)
+    return new_user
+
+
+@app_views.route('/users', methods=['POST'])
+def create_user():
+    """Creates a new User."""
+    new_user = add_user(request.get_json(silent=True))
     storage.save()
     return jsonify(new_user.to_dict()), 201
 
 
-@app_views.route('/users/<user_id>', methods=['PUT'])
-def update_user(user_id):
-    """Updates a User by ID."""
+def edit_user(user_id, data):
+    """Updates a User by ID with data, without saving."""
     user = storage.get(User, user_id)
     if user is None:
         abort(404)
-    data = request.get_json(silent=True)
     if not data:
         abort(400, description="Not a JSON")
     for key, value in data.items():
         if key not in ['id', 'email', 'created_at', 'updated_at']:
             setattr(user, key, value)
+    user.touch()
+    return user
+
+
+@app_views.route('/users/<user_id>', methods=['PUT'])
+def update_user(user_id):
+    """Updates a User by ID."""
+    user = edit_user(user_id, request.get_json(silent=True))
     storage.save()
     return jsonify(user.to_dict()), 200
+
+
+@app_views.route('/users/batch', methods=['POST'])
+def create_users():
+    """Creates a User for each object of the JSON array."""
+    return batch(add_user, 201)
+
+
+@app_views.route('/users/batch', methods=['PUT'])
+def update_users():
+    """Updates a User for each object of the JSON array, by id."""
+    return batch(lambda data: edit_user(data.get('id'), data))
+
+
+@app_views.route('/users/batch', methods=['DELETE'])
+def delete_users():
+    """Deletes a User for each object of the JSON array, by id."""
+    return batch(lambda data: remove_user(data.get('id')))
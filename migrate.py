@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""
+Brings an existing MySQL database up to the schema of the models:
+
+    HBNB_TYPE_STORAGE=db HBNB_MYSQL_USER=... HBNB_MYSQL_PWD=...
+    HBNB_MYSQL_HOST=... HBNB_MYSQL_DB=... ./migrate.py [--dry-run]
+
+adds the tables, columns and indexes the database lacks and prints the
+statements run. Nothing is dropped or altered. With --dry-run, the
+statements are only printed. The models are imported with HBNB_MIGRATE
+set, so that the storage neither creates the missing tables itself nor
+drops the test database.
+"""
+
+import os
+import sys
+
+
+def main(argv):
+    """Migrates the database of the storage, returns the exit status"""
+    os.environ["HBNB_MIGRATE"] = "1"
+    import models
+    if models.storage_t != "db":
+        print("** migrate needs HBNB_TYPE_STORAGE=db **", file=sys.stderr)
+        return 1
+    dry_run = "--dry-run" in argv
+    for statement in models.storage.migrate(dry_run):
+        print(statement + ";")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,6 +3,7 @@
 initialize the models package
 """
 
+from models.engine.async_storage import AsyncStorage
 from os import getenv
 
 
@@ -14,4 +15,6 @@ if storage_t == "db":
 else:
     from models.engine.file_storage import FileStorage
     storage = FileStorage()
-storage.reload()
+if not getenv("HBNB_MIGRATE"):
+    storage.reload()
+async_storage = AsyncStorage(storage, db=storage_t == "db")
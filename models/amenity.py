@@ -4,7 +4,7 @@ import models
 from models.base_model import BaseModel, Base
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 from sqlalchemy.orm import relationship
 
 
@@ -12,6 +12,9 @@ class Amenity(BaseModel, Base):
     """Representation of Amenity """
     if models.storage_t == 'db':
         __tablename__ = 'amenities'
+        __table_args__ = (Index('ix_amenities_name', 'name'),
+                          Index('ix_amenities_created_at', 'created_at',
+                                'id'))
         name = Column(String(128), nullable=False)
     else:
         name = ""
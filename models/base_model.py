@@ -8,10 +8,16 @@ import models
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
+import sys
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+stamps = {}  # dictionary - strings of the datetimes formatted recently
+stamps_max = 65536  # number of strings kept in stamps
+
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -19,26 +25,78 @@ else:
     Base = object
 
 
-class BaseModel:
-    """The BaseModel class from which future classes will be derived"""
-    if models.storage_t == "db":
-        id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+def parse_time(value):
+    """Returns the datetime of a string in the format time"""
+    if len(value) == 26 and value[10] == "T" and value[19] == ".":
+        try:
+            dt = datetime.fromisoformat(value)
+            if dt.tzinfo is None:
+                return dt
+        except ValueError:
+            pass
+    return datetime.strptime(value, time)
+
+
+def format_time(value):
+    """Returns a datetime as a string in the format time"""
+    if value.tzinfo is not None:
+        return value.strftime(time)
+    string = stamps.get(value)
+    if string is None:
+        if value.year >= 1000:
+            string = value.isoformat(timespec="microseconds")
+        else:
+            string = value.strftime(time)
+        if len(stamps) >= stamps_max:
+            stamps.clear()
+        stamps[value] = string
+    return string
+
+
+class ModelType(type):
+    """
+    Metaclass of the models in file mode: the instances of the compact
+    classes built by compact_class() are instances of their model
+    """
+
+    def __instancecheck__(cls, obj):
+        """Returns True if obj is an instance of cls or stands for one"""
+        if type.__instancecheck__(cls, obj):
+            return True
+        model = getattr(type(obj), "_model", None)
+        return model is not None and issubclass(model, cls)
+
+
+class Model(metaclass=type if models.storage_t == "db" else ModelType):
+    """
+    Behavior shared by BaseModel and the compact classes, without any
+    storage of its own (empty __slots__)
+    """
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
         if kwargs:
+            # not stored yet: skip the foreign key hook of __setattr__
+            if type(self).__setattr__ is Model.__setattr__:
+                set_attr = object.__setattr__
+            else:
+                set_attr = setattr
             for key, value in kwargs.items():
                 if key != "__class__":
-                    setattr(self, key, value)
-            if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+                    set_attr(self, key, value)
+            created_at = kwargs.get("created_at", None)
+            updated_at = kwargs.get("updated_at", None)
+            if created_at and type(created_at) is str:
+                self.created_at = parse_time(created_at)
+            elif type(created_at) is not datetime:
                 self.created_at = datetime.utcnow()
-            if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+            if updated_at and type(updated_at) is str:
+                if updated_at == created_at:
+                    self.updated_at = self.created_at
+                else:
+                    self.updated_at = parse_time(updated_at)
+            elif type(updated_at) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -47,29 +105,162 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """Sets an attribute and tells the storage about the change,
+            so that its change set and indexes stay up to date"""
+            old = getattr(self, name, None) if name.endswith("_id") else None
+            object.__setattr__(self, name, value)
+            storage = getattr(models, "storage", None)
+            if storage is not None:
+                storage.changed(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
                                          self.__dict__)
 
-    def save(self):
-        """updates the attribute 'updated_at' with the current datetime"""
+    def touch(self):
+        """updates 'updated_at' and adds the instance to the storage,
+        without saving it"""
         self.updated_at = datetime.utcnow()
         models.storage.new(self)
+
+    def save(self):
+        """updates the attribute 'updated_at' with the current datetime"""
+        self.touch()
         models.storage.save()
 
-    def to_dict(self):
-        """returns a dictionary containing all keys/values of the instance"""
+    def to_dict(self, fields=None):
+        """returns a dictionary containing all keys/values of the instance,
+        or only those of the keys in fields"""
+        if fields is not None:
+            return self.__fields(fields)
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = format_time(new_dict["created_at"])
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = format_time(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
         return new_dict
 
+    def __fields(self, fields):
+        """returns the dictionary of the keys of fields set on the instance,
+        without copying the others"""
+        values = self.__dict__
+        new_dict = {}
+        for key in fields:
+            if key == "__class__":
+                new_dict[key] = self.__class__.__name__
+            elif key in ("created_at", "updated_at") and key in values:
+                new_dict[key] = format_time(values[key])
+            elif key in values and key != "_sa_instance_state":
+                new_dict[key] = values[key]
+        return new_dict
+
     def delete(self):
         """delete the current instance from the storage"""
         models.storage.delete(self)
+
+
+class BaseModel(Model):
+    """The BaseModel class from which future classes will be derived"""
+    if models.storage_t == "db":
+        id = Column(String(60), primary_key=True)
+        created_at = Column(Timestamp, default=datetime.utcnow)
+        updated_at = Column(Timestamp, default=datetime.utcnow)
+
+
+class Compact(Model):
+    """
+    Base of the classes built by compact_class(): declared attributes
+    live in slots, any other attribute in the _extra dictionary, and
+    no class of the hierarchy has a per-instance __dict__
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        """Initializes the instance, sharing equal timestamps"""
+        object.__setattr__(self, "_extra", None)
+        super().__init__(*args, **kwargs)
+        if self.updated_at == self.created_at:
+            self.updated_at = self.created_at
+
+    def __getattr__(self, name):
+        """Returns the extra attribute name, or the class default"""
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and name in extra:
+            return extra[name]
+        defaults = type(self)._defaults
+        if name in defaults:
+            return defaults[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """Sets name in its slot, or in _extra if it is not declared"""
+        if name.endswith("_id") and type(value) is str:
+            value = sys.intern(value)
+        if name in type(self).__slots__:
+            super().__setattr__(name, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            self._extra[name] = value
+            storage = getattr(models, "storage", None)
+            if storage is not None:
+                storage.changed(self, name)
+
+    def __delattr__(self, name):
+        """Deletes the attribute name"""
+        if self._extra is not None and name in self._extra:
+            del self._extra[name]
+        else:
+            super().__delattr__(name)
+
+    @property
+    def __dict__(self):
+        """Returns a dictionary of the attributes set on the instance"""
+        attrs = {}
+        for name in type(self).__slots__:
+            try:
+                attrs[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        attrs.pop("_extra", None)
+        attrs.update(self._extra or {})
+        return attrs
+
+
+compact_classes = {}
+
+
+def compact_class(cls, fields=()):
+    """
+    Returns a class standing for cls, with the same name, methods and
+    properties, storing the id, the timestamps, the attributes declared
+    by cls and fields in slots
+    """
+    if cls not in compact_classes:
+        slots = ["_extra", "id", "created_at", "updated_at"]
+        namespace, defaults = {}, {}
+        for klass in reversed(cls.__mro__):
+            if klass in BaseModel.__mro__:
+                continue
+            for name, value in vars(klass).items():
+                if name.startswith("__"):
+                    continue
+                if callable(value) or isinstance(value, property):
+                    namespace[name] = value
+                else:
+                    defaults[name] = value
+                    if name not in slots:
+                        slots.append(name)
+        slots.extend(f for f in fields if f not in slots)
+        namespace.update({"__slots__": tuple(slots), "__doc__": cls.__doc__,
+                          "__module__": cls.__module__, "_model": cls,
+                          "_defaults": defaults})
+        compact_classes[cls] = type(cls.__name__, (Compact,), namespace)
+    return compact_classes[cls]
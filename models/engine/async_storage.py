@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""
+Contains the class AsyncStorage
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import getenv
+
+
+class AsyncStorage:
+    """
+    Awaitable facade over a FileStorage or a DBStorage.
+
+    Every call runs the blocking storage method in a bounded pool of
+    HBNB_STORAGE_WORKERS threads (4 by default) and is a unit of work of
+    its own: in db mode the session of the worker is closed afterward, so
+    the objects come back detached and writes are committed by the call
+    making them (save(*objs), delete(*objs)). run() makes a unit of work
+    of any function of the storage.
+    """
+
+    def __init__(self, storage, workers=None, db=False):
+        """Initializes the facade of storage with a pool of workers"""
+        if workers is None:
+            workers = int(getenv('HBNB_STORAGE_WORKERS', 4))
+        self.storage = storage
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix="storage")
+
+    async def run(self, func, *args, **kwargs):
+        """Returns the result of func(*args, **kwargs), called in a worker
+        as a unit of work"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(self.__unit, func, *args, **kwargs))
+
+    def __unit(self, func, *args, **kwargs):
+        """Calls func in the worker, then releases its session"""
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if self.db:
+                self.storage.close()
+
+    async def all(self, cls=None, fields=None, load=None):
+        """Returns the dictionary of the objects of cls (all if None)"""
+        return await self.run(self.storage.all, cls, fields, load)
+
+    async def get(self, cls, id):
+        """Returns the object of cls with id, or None"""
+        return await self.run(self.storage.get, cls, id)
+
+    async def count(self, cls=None):
+        """Returns the number of objects of cls (all if None)"""
+        return await self.run(self.storage.count, cls)
+
+    async def counts(self, clss=None):
+        """Returns the number of objects of each class by class name"""
+        return await self.run(self.storage.counts, clss)
+
+    async def page(self, cls, limit=None, after=None, attr=None, value=None,
+                   fields=None):
+        """Returns a page of the objects of cls, as storage.page does"""
+        return await self.run(self.storage.page, cls, limit, after, attr,
+                              value, fields)
+
+    async def iterate(self, cls, attr=None, value=None, fields=None,
+                      batch=1000):
+        """Yields the objects of cls (only those whose attr equals value,
+        if given), fetching them by pages of batch objects"""
+        if fields:
+            fields = list(fields) + ['created_at', 'id']
+        after = None
+        while True:
+            objs = await self.page(cls, batch, after, attr, value, fields)
+            for obj in objs:
+                yield obj
+            if len(objs) < batch:
+                return
+            after = (objs[-1].created_at, objs[-1].id)
+
+    async def search_places(self, states=(), cities=(), amenities=(),
+                            fields=None):
+        """Returns the places matching the search, as storage does"""
+        return await self.run(self.storage.search_places, states, cities,
+                              amenities, fields)
+
+    async def versions(self, clss):
+        """Returns the versions of the classes clss by class name"""
+        return await self.run(self.storage.versions, clss)
+
+    async def save(self, *objs):
+        """Adds objs to the storage and persists every change"""
+        def save():
+            for obj in objs:
+                self.storage.new(obj)
+            self.storage.save()
+        await self.run(save)
+
+    async def delete(self, *objs):
+        """Deletes objs from the storage and persists every change"""
+        def delete():
+            for obj in objs:
+                self.storage.delete(obj)
+            self.storage.save()
+        await self.run(delete)
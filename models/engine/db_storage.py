@@ -3,21 +3,91 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, Timestamp
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+import random
+from sqlalchemy import (BigInteger, Column, String, Table, and_, create_engine,
+                        event, exc, func, inspect, or_, select, update)
+from sqlalchemy.orm import (Session, load_only, scoped_session, selectinload,
+                            sessionmaker)
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+if models.storage_t == "db":
+    versions_table = Table('hbnb_versions', Base.metadata,
+                           Column('name', String(60), primary_key=True),
+                           Column('version', BigInteger, nullable=False),
+                           Column('modified', Timestamp, nullable=True))
+
+pool_options = {"HBNB_MYSQL_POOL_SIZE": ("pool_size", int),
+                "HBNB_MYSQL_MAX_OVERFLOW": ("max_overflow", int),
+                "HBNB_MYSQL_POOL_RECYCLE": ("pool_recycle", int),
+                "HBNB_MYSQL_POOL_TIMEOUT": ("pool_timeout", float),
+                "HBNB_MYSQL_POOL_PRE_PING": (
+                    "pool_pre_ping",
+                    lambda value: value.lower() in ("1", "true", "yes"))}
+
+
+class RoutingSession(Session):
+    """Session reading from a replica until it writes, then from the
+    primary until it is closed, so that it reads its own writes"""
+
+    def __init__(self, replicas=(), **kwargs):
+        """Initializes a session reading from one of replicas"""
+        super().__init__(**kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        """Returns the engine to run the statement on"""
+        if (not self.replicas or self._flushing or
+                self.info.get("primary") or
+                (clause is not None and clause.is_dml)):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if "replica" not in self.info:
+            self.info["replica"] = random.choice(self.replicas)
+        return self.info["replica"]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def pin_primary(session, flush_context):
+    """Pins the session to the primary once it has written"""
+    session.info["primary"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def bump_versions(session, flush_context):
+    """Counts, in the transaction of the flush, a change to each class
+    having objects created, updated or deleted by the flush"""
+    names = {type(obj).__name__ for obj in session.new}
+    names.update(type(obj).__name__ for obj in session.deleted)
+    names.update(type(obj).__name__ for obj in session.dirty
+                 if session.is_modified(obj))
+    names = sorted(names & classes.keys())
+    if not names:
+        return
+    now = datetime.utcnow()
+    connection = session.connection()
+    result = connection.execute(
+        update(versions_table).where(versions_table.c.name.in_(names))
+        .values(version=versions_table.c.version + 1, modified=now))
+    if result.rowcount < len(names):
+        known = set(connection.execute(
+            select(versions_table.c.name)
+            .where(versions_table.c.name.in_(names))).scalars())
+        connection.execute(versions_table.insert(), [
+            {"name": name, "version": 1, "modified": now}
+            for name in names if name not in known])
+
 
 class DBStorage:
     """Interacts with the MySQL database"""
@@ -31,20 +101,37 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
+        options = {}
+        for name, (option, parse) in pool_options.items():
+            if getenv(name):
+                options[option] = parse(getenv(name))
+        url = 'mysql+mysqldb://{}:{}@{}/{}'
         self.__engine = create_engine(
-            'mysql+mysqldb://{}:{}@{}/{}'.format(
+            url.format(
                 HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST, HBNB_MYSQL_DB
-            )
+            ), **options
         )
-        if HBNB_ENV == "test":
+        self.__replicas = [
+            create_engine(replica if '://' in replica else url.format(
+                HBNB_MYSQL_USER, HBNB_MYSQL_PWD, replica, HBNB_MYSQL_DB
+            ), **options)
+            for replica in map(str.strip,
+                               getenv('HBNB_MYSQL_REPLICAS', '').split(','))
+            if replica
+        ]
+        if HBNB_ENV == "test" and not getenv('HBNB_MIGRATE'):
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """Query on the current database session"""
+    def all(self, cls=None, fields=None, load=None):
+        """Query on the current database session, loading only the columns
+        named in fields if given, and eagerly the relationships named in
+        load, e.g. ["cities"] or ["cities.places"]"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = self.__session.query(classes[clss]).options(
+                    *self.__load_only(classes[clss], fields),
+                    *self.__eager(classes[clss], load)).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -63,13 +150,176 @@ class DBStorage:
         if obj is not None:
             self.__session.delete(obj)
 
+    def __load_only(self, cls, fields):
+        """Return the options loading only the columns of cls named in
+        fields (all the columns if fields is None)."""
+        if fields is None:
+            return []
+        columns = cls.__table__.columns
+        return [load_only(*[getattr(cls, field) for field in fields
+                            if field in columns] or [cls.id])]
+
+    def __eager(self, cls, load):
+        """Return the options loading the relationships of cls named in
+        load with one query per level of each dotted path"""
+        options = []
+        for path in load or ():
+            option, owner = None, cls
+            for name in path.split('.'):
+                attr = getattr(owner, name)
+                option = (selectinload(attr) if option is None else
+                          option.selectinload(attr))
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def page(self, cls, limit=None, after=None, attr=None, value=None,
+             fields=None):
+        """Return the list of at most limit objects of the class cls (only
+        those whose attr equals value, if given) ordered by creation date
+        then id, starting after the (created_at, id) pair after."""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = select(cls).options(*self.__load_only(cls, fields))
+        if attr is not None:
+            query = query.where(getattr(cls, attr) == value)
+        if after is not None:
+            created_at, id = after
+            query = query.where(or_(
+                cls.created_at > created_at,
+                and_(cls.created_at == created_at, cls.id > id)))
+        query = query.order_by(cls.created_at, cls.id).limit(limit)
+        return list(self.__session.scalars(query))
+
+    def iterate(self, cls, attr=None, value=None, fields=None, batch=1000):
+        """Yield the objects of the class cls (only those whose attr equals
+        value, if given), fetching them batch rows at a time."""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        query = select(cls).options(*self.__load_only(cls, fields))
+        query = query.execution_options(yield_per=batch)
+        if attr is not None:
+            query = query.where(getattr(cls, attr) == value)
+        yield from self.__session.scalars(query)
+
+    def search_places(self, states=(), cities=(), amenities=(),
+                      fields=None):
+        """Return the list of the places in the states or cities given by
+        id (default: all places) that have every amenity of amenities,
+        in a single query."""
+        from models.place import place_amenity
+        query = select(Place).options(*self.__load_only(Place, fields))
+        if states or cities:
+            query = query.where(or_(
+                Place.city_id.in_(list(cities)),
+                Place.city_id.in_(select(City.id)
+                                  .where(City.state_id.in_(list(states))))))
+        if amenities:
+            amenities = set(amenities)
+            query = query.where(Place.id.in_(
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(amenities))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count() == len(amenities))))
+        return list(self.__session.scalars(query))
+
+    def version(self, cls):
+        """Return the version of the objects of the class cls, which
+        changes whenever one of them is created, updated or deleted, and
+        the datetime of the last update."""
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.versions([cls])[name]
+
+    def versions(self, clss):
+        """Return the versions of the classes clss (see version()) by
+        class name, read from the counters the flushes bump."""
+        names = [c if isinstance(c, str) else c.__name__ for c in clss]
+        if not names:
+            return {}
+        rows = self.__session.execute(
+            select(versions_table.c.name, versions_table.c.version,
+                   versions_table.c.modified)
+            .where(versions_table.c.name.in_(names))).all()
+        found = {name: (str(version), modified)
+                 for name, version, modified in rows}
+        return {name: found.get(name, ("0", None)) for name in names}
+
+    def changes(self):
+        """Return the changes not committed yet: the sets of changed
+        attribute names (None for new objects) by key, and the set of
+        the keys of the deleted objects."""
+        session = self.__session
+        dirty = {}
+        for obj in session.new:
+            dirty[obj.__class__.__name__ + '.' + obj.id] = None
+        for obj in session.dirty:
+            attrs = {attr.key for attr in inspect(obj).attrs
+                     if attr.history.has_changes()}
+            if attrs:
+                dirty[obj.__class__.__name__ + '.' + obj.id] = attrs
+        deleted = {obj.__class__.__name__ + '.' + obj.id
+                   for obj in session.deleted}
+        return dirty, deleted
+
     def reload(self):
         """Reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        self.__seed_versions()
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession,
+                                    replicas=self.__replicas)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
+    def __seed_versions(self):
+        """Inserts the missing version counters, so that the flushes of
+        concurrent sessions only ever update them"""
+        try:
+            with self.__engine.begin() as connection:
+                known = set(connection.execute(
+                    select(versions_table.c.name)).scalars())
+                missing = [{"name": name, "version": 0}
+                           for name in classes if name not in known]
+                if missing:
+                    connection.execute(versions_table.insert(), missing)
+        except exc.IntegrityError:
+            pass
+
+    def migrate(self, dry_run=False):
+        """Add to the database the tables, columns and indexes of the
+        models it lacks, without dropping or altering anything, and return
+        the statements run (only listed if dry_run)."""
+        statements = []
+        with self.__engine.begin() as connection:
+            dialect = connection.dialect
+            inspector = inspect(connection)
+            tables = set(inspector.get_table_names())
+            for table in Base.metadata.sorted_tables:
+                if table.name not in tables:
+                    statements.append(CreateTable(table).compile(
+                        dialect=dialect))
+                    statements.extend(CreateIndex(index).compile(
+                        dialect=dialect) for index in table.indexes)
+                    continue
+                columns = {column["name"] for column in
+                           inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in columns:
+                        statements.append("ALTER TABLE {} ADD {}".format(
+                            dialect.identifier_preparer.format_table(table),
+                            CreateColumn(column).compile(dialect=dialect)))
+                indexes = {index["name"] for index in
+                           inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        statements.append(CreateIndex(index).compile(
+                            dialect=dialect))
+            statements = [str(statement).strip() for statement in statements]
+            if not dry_run:
+                for statement in statements:
+                    connection.exec_driver_sql(statement)
+        return statements
+
     def close(self):
         """Call remove() method on the private session attribute"""
         self.__session.remove()
@@ -77,12 +327,30 @@ class DBStorage:
     def get(self, cls, id):
         """Retrieve one object based on the
         class and ID, or None if not found."""
+        if isinstance(cls, str):
+            cls = classes.get(cls)
         if cls and id:
-            key = "{}.{}".format(cls.__name__, id)
-            return self.all(cls).get(key)
+            return self.__session.get(cls, id)
         return None
 
     def count(self, cls=None):
         """Count the number of objects in storage.
         If cls is provided, count only those objects."""
-        return len(self.all(cls))
+        if cls is not None:
+            if isinstance(cls, str):
+                cls = classes[cls]
+            return self.__session.query(func.count(cls.id)).scalar()
+        return sum(self.counts().values())
+
+    def counts(self, clss=None):
+        """Count the objects of each class of clss (default: all classes)
+        in a single query, and return them by class name."""
+        if clss is None:
+            clss = classes.values()
+        clss = [classes[c] if isinstance(c, str) else c for c in clss]
+        if not clss:
+            return {}
+        query = select(*[select(func.count(c.id)).scalar_subquery()
+                         .label(c.__name__) for c in clss])
+        row = self.__session.execute(query).one()
+        return {c.__name__: n for c, n in zip(clss, row)}
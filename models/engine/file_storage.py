@@ -3,17 +3,28 @@
 Contains the FileStorage class
 """
 
+import atexit
+import bisect
+from datetime import datetime, timezone
 import json
+import os
+import threading
+import time
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, compact_class
 from models.city import City
+from models.engine import serializers
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+foreign_keys = {"Amenity": ("place_id",), "City": ("state_id",),
+                "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
 
 
 class FileStorage:
@@ -21,50 +32,593 @@ class FileStorage:
 
     __file_path = "file.json"  # string - path to the JSON file
     __objects = {}  # dictionary - stores all objects by <class name>.id
+    __by_class = {}  # dictionary - partitions of __objects by class name
+    __indexed = None  # the __objects dict __by_class was built from
+    __children = {}  # dictionary - objects by (class, foreign key) and value
+    __order = {}  # dictionary - sorted (created_at, id) pairs by class name
+    __versions = {}  # dictionary - [changes, time of the last] by class name
+    __epoch = "{:x}".format(time.time_ns())  # tells the runs apart
+    __dirty = {}  # dictionary - names of changed attributes (None: all) by key
+    __deleted = set()  # keys of the objects deleted since the last save
+    __dirty_all = True  # True when every object must be saved
+    __stamp = {}  # dictionary - (inode, size, mtime) of each file by path
+    __records = {}  # dictionary - records last read/written by path
+    __sharded = getenv("HBNB_FILE_SHARDS") == "1"  # one file per class
+    __serializer = serializers.serializers[
+        getenv("HBNB_FILE_FORMAT", "json")]  # format of the written files
+    __loaded = set()  # class names whose file was loaded in sharded mode
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"  # build instances on access
+    __raw = {}  # dictionary - records not built yet by class name and key
+    __slotted = getenv("HBNB_FILE_COMPACT") == "1"  # compact instances
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"  # append-only saves
+    __journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", 1048576))  # bytes
+    __compacting = False  # True while compact() runs in the background
+    __lock = threading.RLock()  # serializes writes to the JSON file
+    __flush_window = float(getenv("HBNB_FILE_FLUSH_WINDOW", 0))  # seconds
+    __flush_wait = getenv("HBNB_FILE_FLUSH_WAIT", "1") == "1"  # durable saves
+    __flush_cond = threading.Condition()  # guards the flush counters
+    __requested = 0  # number of saves requested from the flusher
+    __flushed = 0  # number of requested saves already persisted
+    __flush_error = None  # exception raised by the last flush, if any
+    __flusher = None  # background thread coalescing the saves
 
-    def all(self, cls=None):
-        """Returns the dictionary __objects"""
+    def __reindex(self):
+        """Rebuilds the indexes of __objects if it was replaced"""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            FileStorage.__children = {}
+            FileStorage.__order = {}
+            for key, obj in FileStorage.__objects.items():
+                FileStorage.__by_class.setdefault(
+                    obj.__class__.__name__, {})[key] = obj
+                self.__link(key, obj)
+                self.__touch(obj.__class__.__name__)
+            FileStorage.__indexed = FileStorage.__objects
+            FileStorage.__dirty_all = True
+
+    def __link(self, key, obj, add=True):
+        """
+        Adds obj to (or removes it from) the foreign key and the creation
+        order indexes
+        """
+        name = obj.__class__.__name__
+        for attr in foreign_keys.get(name, ()):
+            values = FileStorage.__children.setdefault((name, attr), {})
+            value = getattr(obj, attr, None)
+            if add:
+                values.setdefault(value, {})[key] = obj
+            elif value in values:
+                values[value].pop(key, None)
+        order = FileStorage.__order.get(name)
+        if order is not None:
+            entry = (obj.created_at, obj.id)
+            i = bisect.bisect_left(order, entry)
+            if add:
+                order.insert(i, entry)
+            elif i < len(order) and order[i] == entry:
+                del order[i]
+
+    def __touch(self, name):
+        """Counts a change to the objects of the class name"""
+        version = FileStorage.__versions.setdefault(name, [0, None])
+        version[0] += 1
+        version[1] = time.time()
+
+    def __partition(self, cls):
+        """Returns the dictionary of objects stored for the class cls"""
+        self.__reindex()
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if (FileStorage.__sharded and cls in classes and
+                cls not in FileStorage.__loaded):
+            FileStorage.__loaded.add(cls)
+            self.__load(self.__shard_path(cls))
+        return FileStorage.__by_class.setdefault(cls, {})
+
+    def __load_all(self):
+        """Loads the JSON files of every class in sharded mode"""
+        if FileStorage.__sharded:
+            for name in classes:
+                self.__partition(name)
+
+    def __put(self, record):
+        """Stores a record read from a JSON file, as an instance unless lazy"""
+        if FileStorage.__lazy:
+            key = record["__class__"] + "." + record["id"]
+            self.__drop(key)
+            self.__touch(record["__class__"])
+            FileStorage.__raw.setdefault(record["__class__"], {})[key] = record
+        else:
+            self.__store(self.__build(record))
+
+    def __build(self, record):
+        """Returns the instance of a record read from a JSON file"""
+        cls = classes[record["__class__"]]
+        if FileStorage.__slotted:
+            cls = compact_class(cls, foreign_keys.get(cls.__name__, ()))
+        return cls(**record)
+
+    def __drop(self, key):
+        """Removes the object or record key from __objects"""
+        name = key.partition(".")[0]
+        obj = self.__partition(name).pop(key, None)
+        if obj is not None:
+            self.__link(key, obj, False)
+            self.__touch(name)
+        if FileStorage.__raw.get(name, {}).pop(key, None) is not None:
+            self.__touch(name)
+        self.__objects.pop(key, None)
+
+    def __hydrate(self, name, key=None):
+        """Builds the instances of the records of class name (or only key)"""
+        raw = FileStorage.__raw.get(name)
+        if not raw:
+            return
+        for key in (list(raw) if key is None else [key]):
+            record = raw.get(key)
+            if record is not None:
+                self.__store(self.__build(record), False)
+
+    def all(self, cls=None, fields=None, load=None):
+        """
+        Returns the dictionary __objects (fields, the names of the
+        attributes needed, is only a hint: objects are loaded whole, and
+        load, the relationships to load eagerly, is ignored as they are
+        read from the foreign key indexes)
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            part = self.__partition(cls)
+            self.__hydrate(cls if isinstance(cls, str) else cls.__name__)
+            return part.copy()
+        self.__load_all()
+        for name in list(FileStorage.__raw):
+            self.__hydrate(name)
         return self.__objects
 
+    def __store(self, obj, touch=True):
+        """
+        Sets obj in __objects and in the indexes, returns its key (touch
+        is False when obj only builds a record already stored)
+        """
+        key = obj.__class__.__name__ + "." + obj.id
+        if touch:
+            self.__touch(obj.__class__.__name__)
+        part = self.__partition(obj.__class__)
+        if key in part:
+            self.__link(key, part[key], False)
+        part[key] = obj
+        self.__link(key, obj)
+        FileStorage.__raw.get(obj.__class__.__name__, {}).pop(key, None)
+        FileStorage.__deleted.discard(key)
+        self.__objects[key] = obj
+        return key
+
     def new(self, obj):
         """Sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            key = self.__store(obj)
+            FileStorage.__dirty[key] = None
 
     def save(self):
         """Serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {key: self.__objects[key].to_dict()
-                        for key in self.__objects}
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        if not FileStorage.__flush_window:
+            self.__persist()
+            return
+        with FileStorage.__flush_cond:
+            FileStorage.__requested += 1
+            target = FileStorage.__requested
+            if FileStorage.__flusher is None:
+                FileStorage.__flusher = threading.Thread(
+                    target=self.__flush_loop, daemon=True)
+                FileStorage.__flusher.start()
+                atexit.register(self.flush)
+            FileStorage.__flush_cond.notify_all()
+            if not FileStorage.__flush_wait:
+                return
+            while FileStorage.__flushed < target:
+                FileStorage.__flush_cond.wait()
+            if FileStorage.__flush_error is not None:
+                raise FileStorage.__flush_error
 
-    def reload(self):
-        """Deserializes the JSON file to __objects"""
+    def __flush_loop(self):
+        """Persists all the saves requested within each flush window"""
+        while True:
+            with FileStorage.__flush_cond:
+                while FileStorage.__flushed >= FileStorage.__requested:
+                    FileStorage.__flush_cond.wait()
+            time.sleep(FileStorage.__flush_window)
+            self.flush()
+
+    def flush(self):
+        """Persists the saves requested and not yet written, if any"""
+        with FileStorage.__flush_cond:
+            target = FileStorage.__requested
+            if FileStorage.__flushed >= target:
+                return
+        error = None
+        try:
+            self.__persist()
+        except Exception as e:
+            error = e
+        with FileStorage.__flush_cond:
+            FileStorage.__flushed = max(FileStorage.__flushed, target)
+            FileStorage.__flush_error = error
+            FileStorage.__flush_cond.notify_all()
+
+    def __persist(self):
+        """Writes the changed objects to the JSON files or their journals"""
+        self.__reindex()
+        with FileStorage.__lock:
+            dirty, deleted = FileStorage.__dirty, FileStorage.__deleted
+            full = FileStorage.__dirty_all
+            FileStorage.__dirty, FileStorage.__deleted = {}, set()
+            FileStorage.__dirty_all = False
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
+            self.__write_changes(None if full else dirty.keys() | deleted)
+        except BaseException:
+            with FileStorage.__lock:
+                for key, attrs in dirty.items():
+                    now = FileStorage.__dirty.get(key, set())
+                    if attrs is None or now is None:
+                        FileStorage.__dirty[key] = None
+                    else:
+                        FileStorage.__dirty[key] = attrs | now
+                FileStorage.__deleted |= deleted - FileStorage.__dirty.keys()
+                FileStorage.__dirty_all = FileStorage.__dirty_all or full
+            raise
+
+    def __write_changes(self, keys=None):
+        """
+        Writes the objects keys (default: all) to their JSON files, from
+        the records last persisted and within one hold of the lock, so
+        that concurrent saves never drop each other's changes
+        """
+        compact = False
+        with FileStorage.__lock:
+            if keys is None:
+                shards = {path: {} for path in self.__shards()}
+                for key, obj in list(self.__objects.items()):
+                    shards.setdefault(self.__path_of(key), {})[key] = \
+                        obj.to_dict()
+                for raw in list(FileStorage.__raw.values()):
+                    for key, record in list(raw.items()):
+                        shards.setdefault(self.__path_of(key), {})[key] = \
+                            record
+            else:
+                shards = {}
+                for key in keys:
+                    path = self.__path_of(key)
+                    if path not in shards:
+                        shards[path] = dict(FileStorage.__records.get(path,
+                                                                      {}))
+                    obj = self.__objects.get(key)
+                    if obj is None:
+                        shards[path].pop(key, None)
+                    else:
+                        shards[path][key] = obj.to_dict()
+            for path, records in shards.items():
+                if (records == FileStorage.__records.get(path) and
+                        FileStorage.__stamp.get(path) ==
+                        self.__file_stamp(path)):
+                    continue
+                if FileStorage.__journal:
+                    size = self.__append(path, records, keys)
+                    compact = compact or size > FileStorage.__journal_max
+                else:
+                    self.__write(path, records)
+                FileStorage.__records[path] = records
+                FileStorage.__stamp[path] = self.__file_stamp(path)
+            compact = compact and not FileStorage.__compacting
+            if compact:
+                FileStorage.__compacting = True
+        if compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def __shard_path(self, name):
+        """Returns the path of the JSON file of the class name"""
+        root, ext = os.path.splitext(self.__file_path)
+        return "{}.{}{}".format(root, name, ext)
+
+    def __path_of(self, key):
+        """Returns the path of the JSON file storing the object key"""
+        if FileStorage.__sharded:
+            return self.__shard_path(key.split(".")[0])
+        return self.__file_path
+
+    def __shards(self):
+        """Returns the paths of the JSON files loaded in __objects"""
+        if FileStorage.__sharded:
+            return [self.__shard_path(name)
+                    for name in sorted(FileStorage.__loaded)]
+        return [self.__file_path]
+
+    def __file_stamp(self, path):
+        """Returns the (inode, size, mtime) of a JSON file and journal"""
+        stamp = []
+        for p in (path, path + ".journal"):
+            try:
+                st = os.stat(p)
+                stamp.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def __write(self, path, records):
+        """Replaces a JSON file with records and drops its journal"""
+        with open(path + ".tmp", 'wb') as f:
+            FileStorage.__serializer.dump(records, f)
+        os.replace(path + ".tmp", path)
+        if os.path.exists(path + ".journal"):
+            os.remove(path + ".journal")
+
+    def __append(self, path, records, keys=None):
+        """
+        Appends to the journal of a JSON file the records (only among
+        keys, if given) that differ from the last ones persisted, and
+        returns the size of the journal
+        """
+        old = FileStorage.__records.get(path, {})
+        if keys is None:
+            keys = records.keys() | old.keys()
+        lines = []
+        for key in keys:
+            record = records.get(key)
+            if old.get(key) != record:
+                lines.append(serializers.dumps({"key": key,
+                                                "record": record}))
+        with open(path + ".journal", 'a') as f:
+            if lines:
+                f.write("\n".join(lines) + "\n")
+            return f.tell()
+
+    def compact(self):
+        """Folds the journals into new snapshots of the JSON files"""
+        try:
+            for path in self.__shards():
+                self.__compact(path)
+        finally:
+            FileStorage.__compacting = False
+
+    def __compact(self, path):
+        """Folds the journal of a JSON file into a new snapshot"""
+        journal = path + ".journal"
+        with FileStorage.__lock:
+            if not os.path.exists(journal):
+                return
+            records = FileStorage.__records.get(path, {})
+            offset = os.path.getsize(journal)
+        with open(path + ".tmp", 'wb') as f:
+            FileStorage.__serializer.dump(records, f)
+        with FileStorage.__lock:
+            with open(journal, 'rb') as f:
+                f.seek(offset)
+                tail = f.read()
+            os.replace(path + ".tmp", path)
+            if tail:
+                with open(journal + ".tmp", 'wb') as f:
+                    f.write(tail)
+                os.replace(journal + ".tmp", journal)
+            else:
+                os.remove(journal)
+            FileStorage.__stamp[path] = self.__file_stamp(path)
+
+    def __read(self, path):
+        """Returns the stamp and the records of a JSON file and journal"""
+        with FileStorage.__lock:
+            stamp = self.__file_stamp(path)
+            if stamp == (None, None):
+                raise FileNotFoundError(path)
+            jo = {}
+            if stamp[0] is not None:
+                with open(path, 'rb') as f:
+                    jo = serializers.load(f)
+            if stamp[1] is not None:
+                with open(path + ".journal", 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            break
+                        if entry["record"] is None:
+                            jo.pop(entry["key"], None)
+                        else:
+                            jo[entry["key"]] = entry["record"]
+        return stamp, jo
+
+    def __load(self, path):
+        """Deserializes a JSON file to __objects"""
+        try:
+            stamp, jo = self.__read(path)
+            FileStorage.__order.clear()
             for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except (FileNotFoundError, json.JSONDecodeError):
+                self.__put(jo[key])
+            FileStorage.__stamp[path] = stamp
+            FileStorage.__records[path] = jo
+        except (FileNotFoundError, ValueError):
             pass
 
+    def reload(self):
+        """Deserializes the JSON file to __objects"""
+        for path in self.__shards():
+            self.__load(path)
+
+    def refresh(self):
+        """
+        Deserializes only the records of the JSON files that changed
+        since they were last read or written, if they changed at all.
+        """
+        for path in self.__shards():
+            try:
+                if self.__file_stamp(path) == FileStorage.__stamp.get(path):
+                    continue
+                stamp, jo = self.__read(path)
+            except (FileNotFoundError, ValueError):
+                continue
+            old = FileStorage.__records.get(path, {})
+            for key, record in jo.items():
+                if old.get(key) != record or not self.__has(key):
+                    self.__put(record)
+            for key in old:
+                if key not in jo:
+                    self.__drop(key)
+            FileStorage.__stamp[path] = stamp
+            FileStorage.__records[path] = jo
+
+    def export(self, path, serializer="json"):
+        """Writes every object to path in the format named serializer"""
+        records = {key: obj.to_dict() for key, obj in self.all().items()}
+        with open(path, 'wb') as f:
+            serializers.serializers[serializer].dump(records, f)
+
+    def related(self, cls, attr, value):
+        """
+        Returns the list of objects of the class cls whose foreign key
+        attr equals value, e.g. related(City, "state_id", state.id)
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__partition(name)
+        self.__hydrate(name)
+        objs = FileStorage.__children.get((name, attr), {}).get(value, {})
+        return list(objs.values())
+
+    def page(self, cls, limit=None, after=None, attr=None, value=None,
+             fields=None):
+        """
+        Returns the list of at most limit objects of the class cls (only
+        those whose attr equals value, if given) ordered by creation date
+        then id, starting after the (created_at, id) pair after
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if attr is None:
+            part = self.__partition(name)
+            self.__hydrate(name)
+            order = FileStorage.__order.get(name)
+            if order is None:
+                order = sorted((obj.created_at, obj.id)
+                               for obj in part.values())
+                FileStorage.__order[name] = order
+        else:
+            part = {name + "." + obj.id: obj
+                    for obj in self.related(name, attr, value)}
+            order = sorted((obj.created_at, obj.id) for obj in part.values())
+        start = 0 if after is None else bisect.bisect_right(order,
+                                                            tuple(after))
+        end = len(order) if limit is None else start + limit
+        return [part[name + "." + id] for created_at, id in order[start:end]]
+
+    def iterate(self, cls, attr=None, value=None, fields=None):
+        """
+        Yields the objects of the class cls (only those whose attr equals
+        value, if given), building the lazily loaded ones as they come
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if attr is not None:
+            yield from self.related(name, attr, value)
+            return
+        part = self.__partition(name)
+        for key in list(part) + list(FileStorage.__raw.get(name, {})):
+            obj = part.get(key)
+            if obj is None:
+                self.__hydrate(name, key)
+                obj = part.get(key)
+            if obj is not None:
+                yield obj
+
+    def search_places(self, states=(), cities=(), amenities=(),
+                      fields=None):
+        """
+        Returns the list of the places in the states or cities given by id
+        (default: all places) that have every amenity of amenities
+        """
+        city_ids = set(cities)
+        for state_id in states:
+            city_ids.update(city.id for city in
+                            self.related(City, "state_id", state_id))
+        if amenities:
+            place_ids = None
+            for amenity_id in set(amenities):
+                amenity = self.get(Amenity, amenity_id)
+                ids = {getattr(amenity, "place_id", None)} - {None}
+                place_ids = ids if place_ids is None else place_ids & ids
+            places = [self.get(Place, place_id) for place_id in place_ids]
+            return [place for place in places if place is not None and
+                    (not (states or cities) or place.city_id in city_ids)]
+        if states or cities:
+            places = []
+            for city_id in city_ids:
+                places.extend(self.related(Place, "city_id", city_id))
+            return places
+        return list(self.all(Place).values())
+
+    def changed(self, obj, attr, old=None):
+        """
+        Records that obj.attr changed (from old, for foreign keys) if obj
+        is stored, and updates the foreign key indexes
+        """
+        name = obj.__class__.__name__
+        self.__reindex()
+        key = name + "." + str(getattr(obj, "id", None))
+        if FileStorage.__by_class.get(name, {}).get(key) is not obj:
+            return
+        self.__touch(name)
+        attrs = FileStorage.__dirty.setdefault(key, set())
+        if attrs is not None:
+            attrs.add(attr)
+        if attr == "created_at":
+            FileStorage.__order.pop(name, None)
+        value = getattr(obj, attr, None)
+        if attr in foreign_keys.get(name, ()) and old != value:
+            values = FileStorage.__children.setdefault((name, attr), {})
+            if old in values:
+                values[old].pop(key, None)
+            values.setdefault(value, {})[key] = obj
+
+    def version(self, cls):
+        """
+        Returns the version of the objects of the class cls, which changes
+        whenever one of them does, and the datetime of the last change
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__partition(name)
+        changes, at = FileStorage.__versions.get(name, (0, None))
+        if at is not None:
+            at = datetime.fromtimestamp(at, timezone.utc).replace(tzinfo=None)
+        return "{}.{}".format(FileStorage.__epoch, changes), at
+
+    def versions(self, clss):
+        """
+        Returns the versions of the classes clss (see version()) by class
+        name
+        """
+        return {cls if isinstance(cls, str) else cls.__name__:
+                self.version(cls) for cls in clss}
+
+    def changes(self):
+        """
+        Returns the changes made since the last save: a dictionary of the
+        sets of changed attribute names (None for new objects) by key, and
+        the set of the keys of the deleted objects
+        """
+        dirty = {key: attrs if attrs is None else set(attrs)
+                 for key, attrs in FileStorage.__dirty.items()}
+        return dirty, set(FileStorage.__deleted)
+
+    def __has(self, key):
+        """Returns True if key is stored, as an instance or as a record"""
+        name = key.partition(".")[0]
+        return key in self.__objects or key in FileStorage.__raw.get(name, {})
+
     def delete(self, obj=None):
         """Delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            self.__drop(key)
+            FileStorage.__dirty.pop(key, None)
+            FileStorage.__deleted.add(key)
 
     def close(self):
-        """Call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """Call refresh() method for deserializing the changed objects"""
+        self.refresh()
 
     def get(self, cls, id):
         """
@@ -73,7 +627,10 @@ class FileStorage:
         """
         if cls and id:
             key = "{}.{}".format(cls.__name__, id)
-            return self.all(cls).get(key)
+            part = self.__partition(cls)
+            if key not in part:
+                self.__hydrate(cls.__name__, key)
+            return part.get(key)
         return None
 
     def count(self, cls=None):
@@ -81,4 +638,20 @@ class FileStorage:
         Count the number of objects in storage.
         If cls is provided, count only those objects.
         """
-        return len(self.all(cls))
+        if cls is not None:
+            part = self.__partition(cls)
+            name = cls if isinstance(cls, str) else cls.__name__
+            return len(part) + len(FileStorage.__raw.get(name, {}))
+        self.__load_all()
+        return len(self.__objects) + sum(
+            len(raw) for raw in FileStorage.__raw.values())
+
+    def counts(self, clss=None):
+        """
+        Count the objects of each class of clss (default: all classes)
+        and return them by class name.
+        """
+        if clss is None:
+            clss = classes
+        return {c if isinstance(c, str) else c.__name__: self.count(c)
+                for c in clss}
@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""
+Contains the serializers used by FileStorage for its snapshot files
+"""
+
+from datetime import datetime, timedelta
+from itertools import repeat
+import json
+import marshal
+from models.base_model import format_time
+import struct
+
+epoch = datetime(1970, 1, 1)
+timestamps = ("created_at", "updated_at")
+
+
+class JSONSerializer:
+    """Writes snapshots as one JSON object keyed by <class name>.id"""
+
+    name = "json"
+
+    def dump(self, records, f):
+        """Writes the dictionary of records to the binary file f"""
+        f.write(dumps(records).encode("utf-8"))
+
+    def load(self, f):
+        """Returns the dictionary of records read from the binary file f"""
+        return json.load(f)
+
+
+class BinarySerializer:
+    """
+    Writes snapshots as a magic header, the length (4 bytes, little
+    endian) of a JSON table of contents, the table of contents and the
+    columns it describes. Each class has one column per field, a JSON
+    array holding that field for every record. Timestamps are JSON
+    arrays of ISO strings, loaded as to_dict() writes them so that the
+    records compare equal to those of the instances, and the rows
+    lacking a field are listed under "absent". Snapshots of version 1
+    (marshal payloads) are still read, to be rewritten at the next save.
+    """
+
+    name = "binary"
+    magic = b"HBNB\x02"
+    legacy = b"HBNB\x01"
+
+    def dump(self, records, f):
+        """Writes the dictionary of records to the binary file f"""
+        groups = {}
+        for record in records.values():
+            groups.setdefault(record["__class__"], []).append(record)
+        tables, blobs, offset = [], [], 0
+        for name, group in groups.items():
+            fields = set()
+            for record in group:
+                fields.update(record)
+            fields.discard("__class__")
+            fields.discard("id")
+            columns = []
+            for field in ("id",) + tuple(sorted(fields)):
+                values, absent = [], []
+                for i, record in enumerate(group):
+                    value = record.get(field, None)
+                    if field not in record:
+                        absent.append(i)
+                    elif isinstance(value, datetime):
+                        value = format_time(value)
+                    values.append(value)
+                kind = "time" if (field in timestamps and all(
+                    self.__is_time(value) for value in values)) else "json"
+                blob = json.dumps(values).encode("utf-8")
+                columns.append({"field": field, "kind": kind,
+                                "offset": offset, "length": len(blob),
+                                "absent": absent})
+                blobs.append(blob)
+                offset += len(blob)
+            tables.append({"class": name, "count": len(group),
+                           "columns": columns})
+        header = json.dumps(tables).encode("utf-8")
+        f.write(self.magic)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+
+    def load(self, f):
+        """Returns the dictionary of records read from the binary file f"""
+        magic = f.read(len(self.magic))
+        if magic == self.legacy:
+            return self.__load_legacy(f)
+        if magic != self.magic:
+            raise ValueError("not a binary snapshot")
+        try:
+            size, = struct.unpack("<I", f.read(4))
+            tables = json.loads(f.read(size))
+            data = f.read()
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError("corrupted binary snapshot") from e
+        records = {}
+        for table in tables:
+            name, fields, columns, absent = table["class"], [], [], []
+            for column in table["columns"]:
+                start = column["offset"]
+                values = json.loads(data[start:start + column["length"]])
+                if len(values) != table["count"]:
+                    raise ValueError("corrupted binary snapshot")
+                fields.append(column["field"])
+                columns.append(values)
+                absent.extend((i, column["field"])
+                              for i in column["absent"])
+            fields.append("__class__")
+            columns.append(repeat(name, table["count"]))
+            rows = [dict(zip(fields, row)) for row in zip(*columns)]
+            for i, field in absent:
+                del rows[i][field]
+            prefix = name + "."
+            records.update(zip([prefix + id for id in columns[0]], rows))
+        return records
+
+    @staticmethod
+    def __is_time(value):
+        """Returns True if value is a to_dict() timestamp or None"""
+        if value is None:
+            return True
+        if type(value) is not str or len(value) != 26:
+            return False
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return False
+        return dt.tzinfo is None and format_time(dt) == value
+
+    @staticmethod
+    def __load_legacy(f):
+        """Returns the records of a version 1 snapshot, whose payload is
+        the marshal dump of (class, fields, rows) tables with timestamps
+        as microseconds since the epoch and missing fields as Ellipsis"""
+        try:
+            tables = marshal.loads(f.read())
+        except (EOFError, TypeError, ValueError) as e:
+            raise ValueError("corrupted binary snapshot") from e
+        records = {}
+        for name, fields, rows in tables:
+            for row in rows:
+                record = {field: value for field, value in zip(fields, row)
+                          if value is not Ellipsis}
+                for field in timestamps:
+                    if type(record.get(field)) is int:
+                        record[field] = format_time(epoch + timedelta(
+                            microseconds=record[field]))
+                record["__class__"] = name
+                records[name + "." + record["id"]] = record
+        return records
+
+
+def encode(value):
+    """Returns a datetime as to_dict() writes it, for json.dumps"""
+    if isinstance(value, datetime):
+        return format_time(value)
+    raise TypeError("{} is not JSON serializable".format(type(value)))
+
+
+def dumps(value):
+    """Returns the JSON of value, datetimes written as to_dict() does"""
+    return json.dumps(value, default=encode)
+
+
+serializers = {"json": JSONSerializer(), "binary": BinarySerializer()}
+
+
+def load(f):
+    """Returns the records of a snapshot file in any supported format"""
+    if f.read(len(BinarySerializer.magic)) in (BinarySerializer.magic,
+                                               BinarySerializer.legacy):
+        f.seek(0)
+        return serializers["binary"].load(f)
+    f.seek(0)
+    return serializers["json"].load(f)
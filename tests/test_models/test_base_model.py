@@ -5,6 +5,7 @@ import inspect
 import models
 import pycodestyle as pep8
 import time
+import tracemalloc
 import unittest
 from unittest import mock
 BaseModel = models.base_model.BaseModel
@@ -138,6 +139,20 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_time_helpers_match_format(self):
+        """Test that parse_time and format_time match strptime/strftime"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        for value in ["2017-06-14T22:31:03.285259",
+                      "2017-06-14T22:31:03.000000",
+                      "2017-06-14T22:31:03.2"]:
+            with self.subTest(value=value):
+                dt = models.base_model.parse_time(value)
+                self.assertEqual(dt, datetime.strptime(value, t_format))
+                self.assertEqual(models.base_model.format_time(dt),
+                                 dt.strftime(t_format))
+        with self.assertRaises(ValueError):
+            models.base_model.parse_time("2017-06-14T22:31:03.28525Z")
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -158,3 +173,54 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    def test_to_dict_fields(self):
+        """Test that to_dict(fields) returns only the keys of fields"""
+        inst = BaseModel()
+        inst.name = "Sparse"
+        self.assertEqual(inst.to_dict(["name", "__class__", "missing"]),
+                         {"name": "Sparse", "__class__": "BaseModel"})
+        full = inst.to_dict()
+        self.assertEqual(inst.to_dict(["id", "created_at"]),
+                         {"id": inst.id, "created_at": full["created_at"]})
+
+    def test_compact_class(self):
+        """Test that compact instances keep the attribute and dict API"""
+        from models.place import Place
+        CompactPlace = models.base_model.compact_class(Place)
+        self.assertIs(models.base_model.compact_class(Place), CompactPlace)
+        place = Place(name="Loft", number_rooms=2, city_id="c1")
+        place.updated_at = place.created_at
+        inst = CompactPlace(**place.to_dict())
+        self.assertIsInstance(inst, Place)
+        self.assertEqual(type(inst).__name__, "Place")
+        self.assertEqual(inst.to_dict(), place.to_dict())
+        self.assertEqual(inst.description, "")
+        self.assertIs(inst.updated_at, inst.created_at)
+        inst.nickname = "ad-hoc"
+        self.assertEqual(inst.nickname, "ad-hoc")
+        self.assertEqual(inst.to_dict()["nickname"], "ad-hoc")
+        self.assertEqual(inst.__dict__["number_rooms"], 2)
+        del inst.nickname
+        with self.assertRaises(AttributeError):
+            inst.nickname
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_compact_memory(self):
+        """Test that compact instances have no __dict__ and use less
+        memory than regular ones"""
+        from models.review import Review
+        CompactReview = models.base_model.compact_class(
+            Review, ("place_id", "user_id"))
+        records = [Review(place_id="p", user_id="u",
+                          text="Review {}".format(i)).to_dict()
+                   for i in range(2000)]
+        self.assertEqual(type(CompactReview(**records[0])).__dictoffset__, 0)
+        sizes = {}
+        for cls in (Review, CompactReview):
+            tracemalloc.start()
+            objs = [cls(**record) for record in records]
+            sizes[cls] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del objs
+        self.assertLess(sizes[CompactReview], sizes[Review] * 0.9)
@@ -15,6 +15,7 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import pycodestyle as pep8
+from sqlalchemy import create_engine, inspect as inspect_obj
 import unittest
 
 
@@ -139,6 +140,81 @@ class TestDBStorage(unittest.TestCase):
         models.storage.save()
         self.assertEqual(models.storage.count(State), initial_state_count)
 
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_load(self):
+        """Test that all loads eagerly the relationships named in load"""
+        state = State(name="Eager")
+        city = City(name="Eager City", state_id=state.id)
+        models.storage.new(state)
+        models.storage.new(city)
+        models.storage.save()
+        models.storage.close()
+        states = models.storage.all(State, load=["cities.places"])
+        loaded = states["State." + state.id]
+        self.assertNotIn("cities", inspect_obj(loaded).unloaded)
+        self.assertEqual([c.id for c in loaded.cities], [city.id])
+        self.assertNotIn("places", inspect_obj(loaded.cities[0]).unloaded)
+        models.storage.delete(loaded.cities[0])
+        models.storage.delete(loaded)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migrate(self):
+        """Test that migrate adds the missing indexes and nothing else"""
+        self.assertEqual(models.storage.migrate(dry_run=True), [])
+        index = [index for index in Place.__table__.indexes
+                 if index.name == "ix_places_price_by_night"][0]
+        with models.storage._DBStorage__engine.begin() as connection:
+            index.drop(connection)
+        statements = models.storage.migrate()
+        self.assertEqual(len(statements), 1)
+        self.assertIn("ix_places_price_by_night", statements[0])
+        self.assertEqual(models.storage.migrate(dry_run=True), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_versions_change_with_every_write(self):
+        """Test that the version of a class changes with each commit
+        changing its objects, even within the same second"""
+        state = State(name="Versioned")
+        models.storage.new(state)
+        models.storage.save()
+        seen = {models.storage.version(State)[0]}
+        for name in ("Once", "Twice"):
+            state.name = name
+            models.storage.save()
+            seen.add(models.storage.version(State)[0])
+        self.assertEqual(len(seen), 3)
+        version = models.storage.version(State)
+        models.storage.save()
+        self.assertEqual(models.storage.version(State), version)
+        models.storage.delete(state)
+        models.storage.save()
+        self.assertNotEqual(models.storage.version(State), version)
+
+
+class TestRoutingSession(unittest.TestCase):
+    """Test the routing of the sessions between primary and replicas"""
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_reads_own_writes(self):
+        """Test that a session reads from a replica until it writes"""
+        primary = create_engine("sqlite://")
+        replica = create_engine("sqlite://")
+        for engine in (primary, replica):
+            State.__table__.create(engine)
+            db_storage.versions_table.create(engine)
+        session = db_storage.RoutingSession(bind=primary, replicas=[replica])
+        self.assertIs(session.get_bind(State), replica)
+        session.add(State(name="Routed"))
+        session.flush()
+        self.assertIs(session.get_bind(State), primary)
+        self.assertEqual(session.query(State).count(), 1)
+        session.close()
+        self.assertIs(db_storage.RoutingSession(
+            bind=primary, replicas=[replica]).get_bind(State), replica)
+        self.assertIs(db_storage.RoutingSession(
+            bind=primary).get_bind(State), primary)
+
 
 if __name__ == "__main__":
     unittest.main()
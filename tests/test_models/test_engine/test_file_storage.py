@@ -3,10 +3,12 @@
 Contains the TestFileStorageDocs and TestFileStorage classes
 """
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 import inspect
 import models
 from models.engine import file_storage
+from models.engine.async_storage import AsyncStorage
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,7 +19,10 @@ from models.user import User
 import json
 import os
 import pycodestyle as pep8
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
 
 FileStorage = file_storage.FileStorage
@@ -160,6 +165,478 @@ class TestFileStorage(unittest.TestCase):
         storage.save()
         self.assertEqual(storage.count(State), initial_count)
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_counts(self):
+        """Test that counts returns the count of each class by name"""
+        storage = FileStorage()
+        counts = storage.counts([State, "City"])
+        self.assertEqual(counts, {"State": storage.count(State),
+                                  "City": storage.count(City)})
+        self.assertEqual(sum(storage.counts().values()), storage.count())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_specific_class(self):
+        """Test that all(cls) returns only the objects of that class"""
+        storage = FileStorage()
+        state = State(name="Partition State")
+        city = City(name="Partition City")
+        storage.new(state)
+        storage.new(city)
+        states = storage.all(State)
+        self.assertIn("State." + state.id, states)
+        self.assertNotIn("City." + city.id, states)
+        self.assertEqual(states, storage.all("State"))
+        for obj in states.values():
+            self.assertIs(type(obj), State)
+        storage.delete(state)
+        storage.delete(city)
+        self.assertNotIn("State." + state.id, storage.all(State))
+        self.assertIsNone(storage.get(City, city.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_partitions_follow_objects(self):
+        """Test that the class partitions follow a replaced __objects"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        state = State(name="Replaced State")
+        FileStorage._FileStorage__objects = {"State." + state.id: state}
+        self.assertEqual(storage.count(State), 1)
+        self.assertEqual(storage.count(City), 0)
+        self.assertIs(storage.get(State, state.id), state)
+        FileStorage._FileStorage__objects = save
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_reloads_changed_records_only(self):
+        """Test that close only rebuilds records changed in file.json"""
+        storage = FileStorage()
+        state = State(name="Unchanged State")
+        other = State(name="Old Name")
+        storage.new(state)
+        storage.new(other)
+        storage.save()
+        storage.close()
+        self.assertIs(storage.get(State, state.id), state)
+        with open("file.json", "r") as f:
+            js = json.load(f)
+        js["State." + other.id]["name"] = "New Name"
+        with open("file.json", "w") as f:
+            json.dump(js, f, indent=1)
+        storage.close()
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(storage.get(State, other.id).name, "New Name")
+        storage.delete(state)
+        storage.delete(storage.get(State, other.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_save_and_compact(self):
+        """Test that journal saves append changes and compact folds them"""
+        storage = FileStorage()
+        storage.save()
+        FileStorage._FileStorage__journal = True
+        try:
+            state = State(name="Journal State")
+            storage.new(state)
+            storage.save()
+            with open("file.json.journal", "r") as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0])["key"], "State." + state.id)
+            storage.delete(state)
+            storage.save()
+            with open("file.json.journal", "r") as f:
+                self.assertEqual(len(f.readlines()), 2)
+            state.name = "Replayed State"
+            storage.new(state)
+            storage.save()
+            storage.delete(state)
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name,
+                             "Replayed State")
+            storage.compact()
+            self.assertFalse(os.path.exists("file.json.journal"))
+            with open("file.json", "r") as f:
+                self.assertIn("State." + state.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__journal = False
+        storage.delete(state)
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_changes_tracked_and_saved(self):
+        """Test that saves only write the objects changed since the last"""
+        storage = FileStorage()
+        state = State(name="Dirty State")
+        storage.new(state)
+        storage.save()
+        self.assertEqual(storage.changes(), ({}, set()))
+        state.name = "Changed State"
+        key = "State." + state.id
+        self.assertEqual(storage.changes(), ({key: {"name"}}, set()))
+        FileStorage._FileStorage__journal = True
+        try:
+            storage.save()
+            with open("file.json.journal", "r") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line["key"] for line in lines], [key])
+            self.assertEqual(lines[0]["record"]["name"], "Changed State")
+            self.assertEqual(storage.changes(), ({}, set()))
+            storage.delete(state)
+            self.assertEqual(storage.changes(), ({}, {key}))
+            storage.save()
+            storage.compact()
+        finally:
+            FileStorage._FileStorage__journal = False
+        with open("file.json", "r") as f:
+            self.assertNotIn(key, json.load(f))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_flusher_coalesces_saves(self):
+        """Test that concurrent saves within a flush window share a write"""
+        storage = FileStorage()
+        persist = FileStorage._FileStorage__persist
+        states = [State(name="Flush {}".format(i)) for i in range(8)]
+        FileStorage._FileStorage__flush_window = 0.2
+        try:
+            with mock.patch.object(FileStorage, "_FileStorage__persist",
+                                   autospec=True,
+                                   side_effect=persist) as m:
+                threads = []
+                for state in states:
+                    storage.new(state)
+                    threads.append(threading.Thread(target=storage.save))
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertLess(m.call_count, len(states))
+            with open("file.json", "r") as f:
+                js = json.load(f)
+            for state in states:
+                self.assertIn("State." + state.id, js)
+        finally:
+            FileStorage._FileStorage__flush_window = 0
+        for state in states:
+            storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_flusher_without_wait(self):
+        """Test that saves return before the flush when not waiting"""
+        storage = FileStorage()
+        state = State(name="Deferred State")
+        FileStorage._FileStorage__flush_window = 60
+        FileStorage._FileStorage__flush_wait = False
+        try:
+            storage.new(state)
+            storage.save()
+            with open("file.json", "r") as f:
+                self.assertNotIn("State." + state.id, json.load(f))
+            storage.flush()
+            with open("file.json", "r") as f:
+                self.assertIn("State." + state.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__flush_window = 0
+            FileStorage._FileStorage__flush_wait = True
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_flusher_survives_errors(self):
+        """Test that a failed flush is raised to the waiting saves and does
+        not stop the flusher"""
+        storage = FileStorage()
+        state = State(name="Flush Error")
+        persist = FileStorage._FileStorage__persist
+        FileStorage._FileStorage__flush_window = 0.01
+        try:
+            storage.new(state)
+            with mock.patch.object(FileStorage, "_FileStorage__persist",
+                                   autospec=True,
+                                   side_effect=RuntimeError("changed")):
+                self.assertRaises(RuntimeError, storage.save)
+            with mock.patch.object(FileStorage, "_FileStorage__persist",
+                                   autospec=True, side_effect=persist):
+                storage.save()
+            with open("file.json", "r") as f:
+                self.assertIn("State." + state.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__flush_window = 0
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_concurrent_saves_keep_every_object(self):
+        """Test that saves running in several threads write every object"""
+        storage = FileStorage()
+        states = []
+
+        def work():
+            for i in range(50):
+                state = State(name="Concurrent {}".format(i))
+                storage.new(state)
+                storage.save()
+                states.append(state)
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        for state in states:
+            self.assertIn("State." + state.id, saved)
+            storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_sharded_lazy_load_and_save(self):
+        """Test that sharded mode loads and writes one file per class"""
+        storage = FileStorage()
+        names = ["file_path", "objects", "sharded", "loaded", "records",
+                 "stamp"]
+        save = {n: getattr(FileStorage, "_FileStorage__" + n) for n in names}
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, "file.json")
+        try:
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__sharded = True
+            FileStorage._FileStorage__loaded = set()
+            FileStorage._FileStorage__records = {}
+            FileStorage._FileStorage__stamp = {}
+            state = State(name="Shard State")
+            city = City(name="Shard City", state_id=state.id)
+            storage.new(state)
+            storage.new(city)
+            storage.save()
+            self.assertEqual(sorted(os.listdir(tmp.name)),
+                             ["file.City.json", "file.State.json"])
+            state_stat = os.stat(os.path.join(tmp.name, "file.State.json"))
+            city.name = "Renamed City"
+            storage.save()
+            self.assertEqual(
+                os.stat(os.path.join(tmp.name, "file.State.json")),
+                state_stat)
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__loaded = set()
+            self.assertEqual(storage.get(State, state.id).name, "Shard State")
+            self.assertEqual(FileStorage._FileStorage__loaded, {"State"})
+            self.assertEqual(storage.count(), 2)
+            self.assertEqual(storage.get(City, city.id).name, "Renamed City")
+        finally:
+            for n, value in save.items():
+                setattr(FileStorage, "_FileStorage__" + n, value)
+            tmp.cleanup()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_binary_format_and_export(self):
+        """Test that binary snapshots reload and export writes JSON"""
+        storage = FileStorage()
+        state = State(name="Binary State")
+        storage.new(state)
+        FileStorage._FileStorage__serializer = \
+            file_storage.serializers.serializers["binary"]
+        try:
+            storage.save()
+            with open("file.json", "rb") as f:
+                self.assertEqual(f.read(4), b"HBNB")
+            storage.delete(state)
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).to_dict(),
+                             state.to_dict())
+            FileStorage._FileStorage__journal = True
+            storage.get(State, state.id).name = "Binary Journal"
+            FileStorage._FileStorage__dirty_all = True  # as after a restart
+            storage.save()
+            with open("file.json.journal", "r") as f:
+                self.assertEqual(len(f.readlines()), 1)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "export.json")
+                storage.export(path)
+                with open(path, "r") as f:
+                    self.assertIn("State." + state.id, json.load(f))
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__serializer = \
+                file_storage.serializers.serializers["json"]
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy_reload(self):
+        """Test that lazy reloads build instances only when accessed"""
+        storage = FileStorage()
+        states = [State(name="Lazy {}".format(i)) for i in range(2)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+        count = storage.count(State)
+        FileStorage._FileStorage__lazy = True
+        try:
+            storage.reload()
+            objects = FileStorage._FileStorage__objects
+            for state in states:
+                self.assertNotIn("State." + state.id, objects)
+            self.assertEqual(storage.count(State), count)
+            version = storage.version(State)
+            first = storage.get(State, states[0].id)
+            self.assertEqual(first.name, "Lazy 0")
+            self.assertIn("State." + states[0].id, objects)
+            self.assertNotIn("State." + states[1].id, objects)
+            storage.get(State, states[1].id)
+            self.assertEqual(storage.version(State), version)
+            storage.delete(first)
+            storage.save()
+            with open("file.json", "r") as f:
+                js = json.load(f)
+            self.assertNotIn("State." + states[0].id, js)
+            self.assertEqual(js["State." + states[1].id],
+                             states[1].to_dict())
+            self.assertIn("State." + states[1].id, storage.all(State))
+        finally:
+            storage.all()
+            FileStorage._FileStorage__lazy = False
+        storage.delete(storage.get(State, states[1].id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """Test that related objects follow new, delete and fk changes"""
+        storage = FileStorage()
+        state = State(name="Parent")
+        other = State(name="Other Parent")
+        city = City(name="Child", state_id=state.id)
+        for obj in (state, other, city):
+            storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        storage.delete(city)
+        self.assertEqual(other.cities, [])
+        storage.delete(state)
+        storage.delete(other)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page_by_creation_order(self):
+        """Test that pages follow creation dates and stay in order"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            base = datetime(2020, 1, 1)
+            states = [State(name=str(i)) for i in range(5)]
+            for i, state in enumerate(states):
+                state.created_at = base + timedelta(i)
+            for state in reversed(states):
+                storage.new(state)
+            self.assertEqual(storage.page(State, 2), states[:2])
+            after = (states[1].created_at, states[1].id)
+            self.assertEqual(storage.page(State, 2, after), states[2:4])
+            early = State(name="early")
+            early.created_at = base - timedelta(1)
+            storage.new(early)
+            storage.delete(states[2])
+            self.assertEqual(storage.page(State, 2, after), states[3:])
+            self.assertEqual(storage.page(State, 1), [early])
+            city = City(state_id=states[0].id)
+            storage.new(city)
+            self.assertEqual(storage.page(City, 10, None, "state_id",
+                                          states[0].id), [city])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iterate_lazy(self):
+        """Test that iterate yields every object, building lazy ones"""
+        storage = FileStorage()
+        state = State(name="Iterated")
+        city = City(name="Iterated City", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        FileStorage._FileStorage__lazy = True
+        try:
+            storage.reload()
+            states = list(storage.iterate(State))
+            self.assertEqual(len(states), storage.count(State))
+            self.assertIn(state.id, [obj.id for obj in states])
+            cities = list(storage.iterate("City", "state_id", state.id))
+            self.assertEqual([obj.id for obj in cities], [city.id])
+        finally:
+            FileStorage._FileStorage__lazy = False
+            storage.all()
+        storage.delete(storage.get(City, city.id))
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_async_storage(self):
+        """Test the awaitable facade over the file storage"""
+        storage = AsyncStorage(FileStorage(), workers=2)
+        state = State(name="Awaited")
+        cities = [City(name="Awaited {}".format(i), state_id=state.id)
+                  for i in range(5)]
+
+        async def run():
+            await storage.save(state, *cities)
+            self.assertIs(await storage.get(State, state.id), state)
+            self.assertEqual(await storage.count(State),
+                             storage.storage.count(State))
+            found = [obj async for obj in storage.iterate(
+                City, "state_id", state.id, batch=2)]
+            self.assertEqual(sorted(city.id for city in found),
+                             sorted(city.id for city in cities))
+            await storage.delete(state, *cities)
+            self.assertIsNone(await storage.get(State, state.id))
+        asyncio.run(run())
+        storage.executor.shutdown()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version_changes_with_objects(self):
+        """Test that class versions change with new, updates and delete"""
+        storage = FileStorage()
+        version, modified = storage.version(State)
+        state = State(name="Versioned")
+        storage.new(state)
+        versions = [version, storage.version(State)[0]]
+        state.name = "Renamed"
+        versions.append(storage.version(State)[0])
+        storage.delete(state)
+        versions.append(storage.version("State")[0])
+        self.assertEqual(len(set(versions)), 4)
+        self.assertIsInstance(storage.version(State)[1], datetime)
+        city_version = storage.version(City)
+        storage.new(state)
+        storage.delete(state)
+        self.assertEqual(storage.version(City), city_version)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_compact_reload(self):
+        """Test that compact reloads build slotted instances"""
+        storage = FileStorage()
+        place = Place(name="Compact Place")
+        amenity = Amenity(name="Wifi", place_id=place.id)
+        storage.new(place)
+        storage.new(amenity)
+        storage.save()
+        FileStorage._FileStorage__slotted = True
+        try:
+            storage.reload()
+            reloaded = storage.get(Place, place.id)
+            self.assertIsNot(type(reloaded), Place)
+            self.assertEqual(reloaded.to_dict(), place.to_dict())
+            self.assertEqual([a.id for a in reloaded.amenities], [amenity.id])
+        finally:
+            FileStorage._FileStorage__slotted = False
+        storage.delete(reloaded)
+        storage.delete(storage.get(Amenity, amenity.id))
+        storage.save()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializersDocs and TestSerializers classes
+"""
+
+import inspect
+import io
+import json
+import marshal
+from models.engine import serializers
+from models.place import Place
+from models.state import State
+import pycodestyle as pep8
+import unittest
+
+
+class TestSerializersDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the serializers"""
+
+    def test_pep8_conformance_serializers(self):
+        """Test that models/engine/serializers.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/serializers.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_serializers_module_docstring(self):
+        """Test for the serializers.py module docstring"""
+        self.assertIsNot(serializers.__doc__, None,
+                         "serializers.py needs a docstring")
+
+    def test_serializers_func_docstrings(self):
+        """Test for the presence of docstrings in serializer methods"""
+        for cls in (serializers.JSONSerializer,
+                    serializers.BinarySerializer):
+            for func in inspect.getmembers(cls, inspect.isfunction):
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the snapshot serializers"""
+
+    def setUp(self):
+        """Builds records of several classes and shapes"""
+        state = State(name="California")
+        place = Place(name="Loft", number_rooms=3, latitude=37.77,
+                      amenity_ids=["a", "b"], description=None)
+        place.created_at = place.created_at.replace(microsecond=0)
+        self.records = {"State." + state.id: state.to_dict(),
+                        "Place." + place.id: place.to_dict()}
+        self.records["State." + state.id]["updated_at"] = "2017-06-14"
+
+    def test_round_trip(self):
+        """Test that every serializer reads back what it wrote"""
+        for name, serializer in serializers.serializers.items():
+            with self.subTest(name=name):
+                f = io.BytesIO()
+                serializer.dump(self.records, f)
+                f.seek(0)
+                records = serializers.load(f)
+                self.assertEqual(json.loads(serializers.dumps(records)),
+                                 self.records)
+
+    def test_binary_loads_records_as_written(self):
+        """Test that binary snapshots load the records of to_dict(), with
+        timestamps as strings"""
+        f = io.BytesIO()
+        serializers.serializers["binary"].dump(self.records, f)
+        f.seek(0)
+        self.assertEqual(serializers.load(f), self.records)
+
+    def test_binary_reads_version_1(self):
+        """Test that the marshal snapshots of version 1 are still read"""
+        payload = [("State", ("id", "created_at", "name"),
+                    [("1", 1497398400000000, "Kansas")])]
+        f = io.BytesIO(b"HBNB\x01" + marshal.dumps(payload))
+        self.assertEqual(serializers.load(f), {"State.1": {
+            "id": "1", "created_at": "2017-06-14T00:00:00.000000",
+            "name": "Kansas",
+            "__class__": "State"}})
+
+    def test_binary_is_smaller(self):
+        """Test that the binary snapshot is smaller than the JSON one"""
+        for i in range(20):
+            state = State(name="State {}".format(i))
+            self.records["State." + state.id] = state.to_dict()
+        sizes = {}
+        for name, serializer in serializers.serializers.items():
+            f = io.BytesIO()
+            serializer.dump(self.records, f)
+            sizes[name] = len(f.getvalue())
+        self.assertLess(sizes["binary"], sizes["json"])
+
+    def test_binary_corrupted(self):
+        """Test that a truncated binary snapshot raises ValueError"""
+        f = io.BytesIO()
+        serializers.serializers["binary"].dump(self.records, f)
+        with self.assertRaises(ValueError):
+            serializers.load(io.BytesIO(f.getvalue()[:-10]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,17 @@ Contains the TestPlaceDocs classes
 
 from datetime import datetime
 import inspect
+from api.v1.app import app
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.city import City
+from models.state import State
+from models.user import User
 import pycodestyle as pep8
 import unittest
+from unittest import mock
 Place = place.Place
 
 
@@ -198,3 +204,111 @@ class TestPlace(unittest.TestCase):
         place = Place()
         string = "[Place] ({}) {}".format(place.id, place.__dict__)
         self.assertEqual(string, str(place))
+
+
+class TestPlaceAPI(unittest.TestCase):
+    """Test API endpoints related to Place"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up Flask test client for testing"""
+        app.testing = True
+        cls.client = app.test_client()
+
+    def setUp(self):
+        """Create two states with a city and a place each"""
+        self.ctx = app.app_context()
+        self.ctx.push()
+        self.user = User(email="search@hbnb.io", password="pwd")
+        self.states = [State(name="S1"), State(name="S2")]
+        self.cities = [City(name="C1", state_id=self.states[0].id),
+                       City(name="C2", state_id=self.states[1].id)]
+        self.places = [Place(name="P1", city_id=self.cities[0].id,
+                             user_id=self.user.id),
+                       Place(name="P2", city_id=self.cities[1].id,
+                             user_id=self.user.id)]
+        self.objs = [self.user] + self.states + self.cities + self.places
+        if models.storage_t != 'db':
+            self.amenity = Amenity(name="Wifi", place_id=self.places[1].id)
+            self.objs.append(self.amenity)
+        for obj in self.objs:
+            models.storage.new(obj)
+        models.storage.save()
+
+    def tearDown(self):
+        """Remove the created objects"""
+        for obj in reversed(self.objs):
+            models.storage.delete(obj)
+        models.storage.save()
+        self.ctx.pop()
+
+    def search(self, data):
+        """Returns the names of the places found for data"""
+        response = self.client.post("/api/v1/places_search", json=data)
+        self.assertEqual(response.status_code, 200)
+        return sorted(place.get("name", "") for place in response.json)
+
+    def test_places_search_invalid_json(self):
+        """Test POST /api/v1/places_search with a body that is not JSON"""
+        response = self.client.post("/api/v1/places_search", data="x",
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_places_search_invalid_ids(self):
+        """Test POST /api/v1/places_search with lists that are not ids"""
+        for data in ({"states": "abc"}, {"cities": {"id": "x"}},
+                     {"amenities": [["x"]]}, {"amenities": [{"id": 1}]}):
+            response = self.client.post("/api/v1/places_search", json=data)
+            self.assertEqual(response.status_code, 400, data)
+
+    def test_places_search_all(self):
+        """Test that empty lists find every place"""
+        names = self.search({"states": [], "cities": []})
+        self.assertIn("P1", names)
+        self.assertIn("P2", names)
+
+    def test_places_search_states_and_cities(self):
+        """Test that states and cities are joined"""
+        self.assertEqual(self.search({"states": [self.states[0].id]}),
+                         ["P1"])
+        self.assertEqual(self.search({"states": [self.states[0].id],
+                                      "cities": [self.cities[1].id]}),
+                         ["P1", "P2"])
+
+    def test_places_batch(self):
+        """Test the batch routes create, update and delete with one save"""
+        url = "/api/v1/cities/{}/places/batch".format(self.cities[0].id)
+        items = [{"name": "B1", "user_id": self.user.id}, {"name": "B2"},
+                 {"name": "B3", "user_id": "missing"}, "B4"]
+        with mock.patch.object(models.storage, "save",
+                               wraps=models.storage.save) as save:
+            response = self.client.post(url, json=items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["status"] for item in response.json],
+                         [201, 400, 404, 400])
+        self.assertEqual(response.json[1]["error"], "Missing user_id")
+        self.assertEqual(save.call_count, 1)
+        place_id = response.json[0]["object"]["id"]
+        self.assertEqual(models.storage.get(Place, place_id).name, "B1")
+
+        response = self.client.put("/api/v1/places/batch",
+                                   json=[{"id": place_id, "name": "B5"},
+                                         {"id": "missing"}])
+        self.assertEqual([item["status"] for item in response.json],
+                         [200, 404])
+        self.assertEqual(models.storage.get(Place, place_id).name, "B5")
+        response = self.client.delete("/api/v1/places/batch",
+                                      json=[{"id": place_id}])
+        self.assertEqual(response.json, [{"status": 200}])
+        self.assertIsNone(models.storage.get(Place, place_id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_places_search_amenities(self):
+        """Test that amenities filter the places found"""
+        self.assertEqual(self.search({"amenities": [self.amenity.id]}),
+                         ["P2"])
+        self.assertEqual(self.search({"states": [self.states[0].id],
+                                      "amenities": [self.amenity.id]}),
+                         [])
+        self.assertEqual(self.search({"amenities": [self.amenity.id,
+                                                    "missing"]}), [])
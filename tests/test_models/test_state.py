@@ -4,9 +4,16 @@ Contains the TestStateDocs, TestState classes, and API tests.
 """
 
 import unittest
+import asyncio
+import gzip
 import inspect
+import json
 import pycodestyle as pep8
+import threading
+from unittest import mock
+from api.v1 import asgi
 from api.v1.app import app
+from api.v1.asgi import application
 from models import storage
 from models import state
 from models.state import State
@@ -117,6 +124,230 @@ class TestStateAPI(unittest.TestCase):
         storage.delete(state)
         storage.save()
 
+    def test_get_states_paged(self):
+        """Test GET /api/v1/states with limit and cursor"""
+        states = [State(name="Paged {}".format(i)) for i in range(3)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+
+        names = []
+        url = '/api/v1/states?limit=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json), 2)
+            names.extend(state.get("name") for state in response.json)
+            link = response.headers.get("Link")
+            url = link[link.index("/api"):link.index(">")] if link else None
+        self.assertEqual(len(names), storage.count(State))
+        for state in states:
+            self.assertIn(state.name, names)
+        response = self.client.get('/api/v1/states?cursor=invalid')
+        self.assertEqual(response.status_code, 400)
+
+        # Clean up
+        for state in states:
+            storage.delete(state)
+        storage.save()
+
+    def test_get_states_streamed(self):
+        """Test GET /api/v1/states as a streamed array and as NDJSON"""
+        state = State(name="Streamed")
+        storage.new(state)
+        storage.save()
+
+        response = self.client.get('/api/v1/states?stream=json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(state.id, [obj["id"] for obj in response.json])
+        response = self.client.get(
+            '/api/v1/states', headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), storage.count(State))
+        self.assertIn(state.id, [json.loads(line)["id"] for line in lines])
+
+        # Clean up
+        storage.delete(state)
+        storage.save()
+
+    def test_get_state_conditional(self):
+        """Test conditional GET of /api/v1/states and a single State"""
+        state = State(name="Conditional")
+        storage.new(state)
+        storage.save()
+
+        for url in ['/api/v1/states', f'/api/v1/states/{state.id}']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers["ETag"]
+            self.assertIn("Last-Modified", response.headers)
+            response = self.client.get(url, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+
+        other = State(name="Other")
+        storage.new(other)
+        storage.save()
+        response = self.client.get(f'/api/v1/states/{state.id}',
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.put(f'/api/v1/states/{state.id}',
+                                   json={"name": "Changed"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/v1/states/{state.id}',
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["name"], "Changed")
+        response = self.client.get(
+            f'/api/v1/states/{state.id}',
+            headers={"If-Modified-Since": response.headers["Last-Modified"]})
+        self.assertEqual(response.status_code, 304)
+
+        # Clean up
+        storage.delete(other)
+        storage.delete(state)
+        storage.save()
+
+    def test_get_states_cached(self):
+        """Test that /api/v1/states is cached until a State changes"""
+        self.client.get('/api/v1/states')
+        stats = self.client.get('/api/v1/stats/cache').json
+        response = self.client.get('/api/v1/states')
+        self.assertEqual(response.headers["X-Cache"], "HIT")
+        self.assertEqual(self.client.get('/api/v1/stats/cache').json["hits"],
+                         stats["hits"] + 1)
+
+        response = self.client.post('/api/v1/states', json={"name": "New"})
+        state_id = response.json["id"]
+        response = self.client.get('/api/v1/states')
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertIn(state_id, [state["id"] for state in response.json])
+
+        # Clean up
+        storage.delete(storage.get(State, state_id))
+        storage.save()
+
+    def test_get_states_fields(self):
+        """Test GET /api/v1/states with a sparse fieldset"""
+        state = State(name="Sparse")
+        storage.new(state)
+        storage.save()
+
+        response = self.client.get('/api/v1/states?fields=id,name')
+        self.assertIn({"id": state.id, "name": "Sparse"}, response.json)
+        for obj in response.json:
+            self.assertLessEqual(set(obj), {"id", "name"})
+        response = self.client.get(
+            f'/api/v1/states/{state.id}?fields=@summary,created_at')
+        self.assertEqual(set(response.json), {"id", "name", "created_at"})
+        response = self.client.get('/api/v1/states?fields=@card')
+        self.assertEqual(response.status_code, 400)
+
+        # Clean up
+        storage.delete(state)
+        storage.save()
+
+    def test_get_states_compressed(self):
+        """Test that /api/v1/states is gzipped for clients accepting it"""
+        states = [State(name="Compressed {}".format(i)) for i in range(20)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+
+        plain = self.client.get('/api/v1/states')
+        self.assertNotIn("Content-Encoding", plain.headers)
+        headers = {"Accept-Encoding": "gzip"}
+        for cache in ("MISS", "HIT"):
+            response = self.client.get('/api/v1/states', headers=headers)
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+            self.assertTrue(response.headers["ETag"].startswith('W/'))
+            self.assertEqual(json.loads(gzip.decompress(response.data)),
+                             plain.json)
+        response = self.client.get(
+            '/api/v1/states', headers=dict(headers, **{
+                "If-None-Match": response.headers["ETag"]}))
+        self.assertEqual(response.status_code, 304)
+        self.assertTrue(response.headers["ETag"].startswith('W/'))
+        response = self.client.get(f'/api/v1/states/{states[0].id}',
+                                   headers=headers)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertFalse(response.headers["ETag"].startswith('W/'))
+        response = self.client.get(
+            f'/api/v1/states/{states[0].id}', headers=dict(headers, **{
+                "If-None-Match": response.headers["ETag"]}))
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.headers["ETag"].startswith('W/'))
+
+        # Clean up
+        for state in states:
+            storage.delete(state)
+        storage.save()
+
+    def test_states_asgi(self):
+        """Test creating and listing States through the ASGI application"""
+        async def call(method, path, body=b"", query=b""):
+            messages = [{"type": "http.request", "body": body}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message)
+            await application({
+                "type": "http", "method": method, "path": path,
+                "query_string": query, "headers": [
+                    (b"content-type", b"application/json")]},
+                receive, send)
+            return sent[0]["status"], b"".join(
+                message.get("body", b"") for message in sent[1:])
+
+        status, body = asyncio.run(call(
+            "POST", "/api/v1/states", json.dumps({"name": "Async"}).encode()))
+        self.assertEqual(status, 201)
+        state_id = json.loads(body)["id"]
+        status, body = asyncio.run(call("GET", "/api/v1/states",
+                                        query=b"stream=ndjson"))
+        self.assertEqual(status, 200)
+        self.assertIn(state_id, [json.loads(line)["id"]
+                                 for line in body.splitlines()])
+
+        # Clean up
+        storage.delete(storage.get(State, state_id))
+        storage.save()
+
+    def test_states_asgi_slow_client(self):
+        """Test that the ASGI worker is released before a slow client has
+        read the response"""
+        released = threading.Event()
+        respond = asgi.respond
+
+        def tracked(*args):
+            respond(*args)
+            released.set()
+
+        async def call():
+            messages = [{"type": "http.request", "body": b""}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                waited = await asyncio.to_thread(released.wait, 5)
+                sent.append((waited, message))
+            await application({"type": "http", "method": "GET",
+                               "path": "/api/v1/states"}, receive, send)
+            return sent
+
+        with mock.patch.object(asgi, "respond", side_effect=tracked):
+            sent = asyncio.run(call())
+        self.assertEqual(sent[0][1]["status"], 200)
+        self.assertTrue(all(waited for waited, message in sent))
+
 
 if __name__ == '__main__':
     unittest.main()
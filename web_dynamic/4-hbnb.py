@@ -2,11 +2,13 @@
 """Flask app for HBNB with dynamic places filtering by amenities."""
 
 from flask import Flask, render_template
+from api.v1.compression import compress
 from models import storage
 import uuid
 
 app = Flask(__name__)
 app.url_map.strict_slashes = False
+compress(app)
 
 
 @app.teardown_appcontext